@@ -3,24 +3,32 @@ Tuya Cloud Custom: __init__.py
 -------------------------------
 Main entry for the custom integration.
 Handles:
-✅ Config Flow setup
+✅ Config Flow setup (one entry per Tuya cloud project)
 ✅ Devices loader (from config/devices/*.yaml)
 ✅ Periodic token refresh in executor
 ✅ Status poller
+✅ Optional record / replay of raw cloud responses
+✅ Bulk command service
+✅ Durable offline command queue
+✅ Every timer / task owned by the entry's Lifecycle, cancelled on unload
 """
 
 import os
-import yaml
 import logging
+import voluptuous as vol
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.typing import ConfigType
-from homeassistant.helpers.event import async_call_later
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN
-from .helpers.device_loader import load_tuya_devices
+from .const import DOMAIN, DEFAULT_PROJECT, COMMAND_QUEUE_MAX_AGE, COMMAND_QUEUE_RETRY_INTERVAL, BACKFILL_INTERVAL
+from .helpers.cloud_client import TuyaCloudClient
+from .helpers.device_loader import load_tuya_devices, build_platform_index
+from .helpers.lifecycle import Lifecycle
 from .helpers.token_refresh import refresh_token
+from .helpers.restore import RestoreCoordinator
+from .helpers.command_queue import CommandQueue
 from .status import Status
 
 _LOGGER = logging.getLogger(__name__)
@@ -31,14 +39,49 @@ _LOGGER = logging.getLogger(__name__)
 COMPONENT_PATH = os.path.dirname(__file__)
 CONFIG_PATH = os.path.join(COMPONENT_PATH, "config")
 DEVICES_DIR = os.path.join(CONFIG_PATH, "devices")
-TOKEN_FILE = os.path.join(CONFIG_PATH, "tuya_token.json")
-SECRETS_FILE = os.path.join(CONFIG_PATH, "secrets.yaml")
+SPECS_DIR = os.path.join(CONFIG_PATH, "specs")
+
+
+def _project_files(project: str) -> dict:
+    """Per-project files; the default project keeps the original file names."""
+    suffix = "" if project == DEFAULT_PROJECT else f"_{project}"
+    return {
+        "secrets_file": os.path.join(CONFIG_PATH, f"secrets{suffix}.yaml"),
+        "token_file": os.path.join(CONFIG_PATH, f"tuya_token{suffix}.json"),
+        "queue_file": os.path.join(CONFIG_PATH, f"command_queue{suffix}.json"),
+        "snapshot_file": os.path.join(CONFIG_PATH, f"dp_snapshot{suffix}.json"),
+        "backfill_cursor": os.path.join(CONFIG_PATH, f"backfill_cursor{suffix}.json"),
+    }
 
 # ------------------------------------------------------------------------------
 # Platforms to register
 # ------------------------------------------------------------------------------
 PLATFORMS = ["switch", "sensor", "number", "climate", "binary_sensor", "select"]
 
+# ------------------------------------------------------------------------------
+# Services
+# ------------------------------------------------------------------------------
+SERVICE_REPLAY = "replay_recording"
+REPLAY_SCHEMA = vol.Schema({
+    vol.Required("file"): cv.string,
+    vol.Optional("realtime", default=False): cv.boolean,
+})
+
+SERVICE_BULK_COMMAND = "bulk_command"
+BULK_COMMAND_SCHEMA = vol.Schema({
+    vol.Required("targets"): vol.All(cv.ensure_list, [vol.Schema({
+        vol.Required("device_id"): cv.string,
+        vol.Required("code"): cv.string,
+        vol.Required("value"): vol.Any(bool, int, float, str),
+    })]),
+    vol.Optional("max_parallel", default=8): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+})
+
+SERVICE_DUMP_TRACE = "dump_trace"
+DUMP_TRACE_SCHEMA = vol.Schema({
+    vol.Optional("file", default="request_trace.jsonl"): cv.string,
+})
+
 # ------------------------------------------------------------------------------
 # ✅ Legacy YAML fallback (optional)
 # ------------------------------------------------------------------------------
@@ -51,27 +94,65 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 # ------------------------------------------------------------------------------
 # ✅ Setup from Config Entry
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Setup Tuya Cloud Custom from UI Config Entry."""
-
-    # 1️⃣ Initialize main data store early
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN]["devices"] = []   # placeholder until we validate
-    hass.data[DOMAIN]["entities"] = {}  # central registry for all entities
-    hass.data[DOMAIN]["status"] = None  # will set below
-    hass.data[DOMAIN]["token_file"] = TOKEN_FILE
-    hass.data[DOMAIN]["secrets_file"] = SECRETS_FILE
+    """Setup one Tuya cloud project from a UI Config Entry."""
+
+    project = entry.data.get("project", DEFAULT_PROJECT)
+    files = _project_files(project)
+    if entry.unique_id is None:  # entries from before one-entry-per-project
+        hass.config_entries.async_update_entry(entry, unique_id=project)
+
+    # 1️⃣ Initialize this entry's data store early
+    data = {
+        "project": project,
+        "devices": [],      # placeholder until we validate
+        "device_ids": set(),
+        "entities": {},     # central registry for this project's entities
+        "status": None,     # will set below
+        "token_file": files["token_file"],
+        "secrets_file": files["secrets_file"],
+        "snapshot_file": files["snapshot_file"],
+        "lifecycle": Lifecycle(hass, project),  # owns timers, tasks and closers
+    }
+    data["restore"] = RestoreCoordinator(hass, data)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = data
 
     # 2️⃣ Validate secrets.yaml safely
-    secrets = await hass.async_add_executor_job(_check_secrets)
+    secrets = await hass.async_add_executor_job(_check_secrets, files["secrets_file"])
     if secrets is None:
+        hass.data[DOMAIN].pop(entry.entry_id)
         return False
-    hass.data[DOMAIN]["secrets"] = secrets
-
-    # 3️⃣ Load all device YAMLs safely
-    devices = await hass.async_add_executor_job(load_tuya_devices, DEVICES_DIR)
+    data["secrets"] = secrets
+    data["client"] = TuyaCloudClient.from_secrets(secrets, files["token_file"])
+    lifecycle = data["lifecycle"]
+    lifecycle.add_closer("http session", data["client"].close, in_executor=True)
+
+    # 📼 Optional raw response recording
+    if secrets.get("record_file"):
+        from .helpers.recorder import CloudRecorder
+        record_path = _resolve_path(secrets["record_file"])
+        data["recorder"] = CloudRecorder(record_path)
+        lifecycle.add_closer("recorder", data["recorder"].close, in_executor=True)
+        _LOGGER.info("[%s] 📼 Recording cloud responses to %s", DOMAIN, record_path)
+
+    # 🧵 Optional out-of-process cloud worker (started with Status)
+    if secrets.get("worker_process"):
+        from .helpers.cloud_worker import CloudWorkerBridge
+        data["worker"] = CloudWorkerBridge(hass, data)
+
+    # 📥 Offline command queue (survives restarts)
+    queue = CommandQueue(hass, data, files["queue_file"],
+                         int(secrets.get("command_queue_max_age") or COMMAND_QUEUE_MAX_AGE))
+    await hass.async_add_executor_job(queue.load)
+    data["command_queue"] = queue
+
+    # 3️⃣ Load all device YAMLs safely, keep the ones bound to this project
+    all_devices = await hass.async_add_executor_job(load_tuya_devices, DEVICES_DIR)
+    devices = [d for d in all_devices if d.get("project", DEFAULT_PROJECT) == project]
 
     if not devices:
-        _LOGGER.warning("[%s] ⚠️ No valid devices found in %s — nothing to set up.", DOMAIN, DEVICES_DIR)
+        _LOGGER.warning("[%s] ⚠️ No valid devices for project '%s' in %s — nothing to set up.",
+                        DOMAIN, project, DEVICES_DIR)
+        hass.data[DOMAIN].pop(entry.entry_id)
         return False
 
     # 4️⃣ NEW: Enforce no duplicate tuya_device_id
@@ -80,78 +161,175 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         tuya_id = device.get("tuya_device_id")
         if not tuya_id:
             _LOGGER.error("[%s] ❌ Device block missing 'tuya_device_id'!", DOMAIN)
+            hass.data[DOMAIN].pop(entry.entry_id)
             return False  # hard stop
         if tuya_id in seen_tuya_ids:
             _LOGGER.error("[%s] ❌ Duplicate tuya_device_id detected: '%s'. "
                            "Each device must have a unique ID. Fix your YAML!", DOMAIN, tuya_id)
+            hass.data[DOMAIN].pop(entry.entry_id)
             return False  # hard stop
         seen_tuya_ids.add(tuya_id)
 
     # 5️⃣ Store validated devices
-    hass.data[DOMAIN]["devices"] = devices
-
-    # 6️⃣ Refresh token immediately (in executor)
-    await hass.async_add_executor_job(refresh_token, SECRETS_FILE, TOKEN_FILE)
-
-    # 7️⃣ Schedule periodic token refresh + force status update
+    data["devices"] = devices
+    data["device_ids"] = seen_tuya_ids
+
+    # 📘 Product specifications: fill in / validate entity definitions.
+    # Cached specs come from disk; only products seen for the first time need the cloud now.
+    from .helpers.spec_cache import load_specs, apply_specs
+    specs = await hass.async_add_executor_job(load_specs, devices, data["client"], SPECS_DIR, False)
+    token_refreshed = False
+    if any(d.get("tuya_product_id") and d["tuya_product_id"] not in specs for d in devices):
+        await hass.async_add_executor_job(refresh_token, files["secrets_file"], files["token_file"])
+        token_refreshed = True
+        specs = await hass.async_add_executor_job(load_specs, devices, data["client"], SPECS_DIR)
+    data["dp_specs"] = apply_specs(devices, specs)
+
+    # 🏠 Optional LAN transport (falls back to the cloud per request)
+    if any(d.get("local") for d in devices):
+        from .helpers.local_transport import build_local_devices
+        data["local"] = build_local_devices(devices)
+
+    # 6️⃣ Forward only the platforms the device YAMLs actually use
+    data["platform_index"] = build_platform_index(devices)
+    platforms = [p for p in PLATFORMS if data["platform_index"].get(p)]
+    data["platforms"] = platforms
+    _LOGGER.info("[%s] 🧩 [%s] Forwarding platforms: %s", DOMAIN, project, platforms)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
+
+    # 7️⃣ Last-known values from the snapshot, before any (further) network call
+    status = Status(hass, data)
+    data["status"] = status
+    lifecycle.add_closer("status", status.async_stop)
+    await status.async_load_snapshot()
+
+    # 8️⃣ Refresh token (in executor) unless the spec fetch above already did
+    if not token_refreshed:
+        await hass.async_add_executor_job(refresh_token, files["secrets_file"], files["token_file"])
+
+    # 9️⃣ Schedule periodic token refresh + force status update
     interval = int(secrets.get("token_refresh", 110)) * 60  # min → sec
 
     async def _refresh_loop(_):
-        await hass.async_add_executor_job(refresh_token, SECRETS_FILE, TOKEN_FILE)
+        await hass.async_add_executor_job(refresh_token, files["secrets_file"], files["token_file"])
+        await status.async_fetch_all_devices()
+        lifecycle.call_later("token", interval, _refresh_loop)
 
-        status = hass.data[DOMAIN].get("status")
-        if status:
-            await status.async_fetch_all_devices()
+    lifecycle.call_later("token", interval, _refresh_loop)
 
-        async_call_later(hass, interval, _refresh_loop)
+    # 🔟 Start polling once all platforms have registered
+    async def _start_status(_):
+        await status.async_start_polling()
+        await status.async_start_online_check(secrets["online_check_interval"])
+        await status.async_warm_up()
+        await data["restore"].async_start()
 
-    async_call_later(hass, interval, _refresh_loop)
+        async def _retry_queue(now):
+            if queue.has_pending() and not status.load.overloaded():
+                await queue.async_retry(now)
 
-    # 8️⃣ Forward platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        lifecycle.track_interval("queue_retry", _retry_queue, COMMAND_QUEUE_RETRY_INTERVAL)
 
-    # 9️⃣ Start Status after all platforms have registered
-    async def _start_status(_):
-        status = Status(hass)
-        hass.data[DOMAIN]["status"] = status
-        await status.async_start_polling()
+        # 📈 Report-log backfill for sensors with `backfill: true`
+        if any(dp.get("backfill") for _, dp in data["platform_index"].get("sensor", [])):
+            from .helpers.backfill import ReportLogBackfill
+            backfill = ReportLogBackfill(hass, data, files["backfill_cursor"])
+            lifecycle.create_task(backfill.async_run())
+            lifecycle.track_interval("backfill", backfill.async_run, BACKFILL_INTERVAL)
+
+    lifecycle.call_later("startup", 1, _start_status)
 
-    async_call_later(hass, 1, _start_status)
+    # 🛠️ Services (shared by all projects, registered once)
+    _register_services(hass)
 
-    _LOGGER.info("[%s] ✅ Tuya Cloud Custom setup complete!", DOMAIN)
+    _LOGGER.info("[%s] ✅ Tuya Cloud Custom project '%s' setup complete!", DOMAIN, project)
     return True
 
 
+def _register_services(hass: HomeAssistant):
+    """Register domain services once; they route per device to the owning project."""
+    if hass.services.has_service(DOMAIN, SERVICE_BULK_COMMAND):
+        return
+
+    async def _handle_replay(call: ServiceCall):
+        from .helpers.recorder import async_replay
+        await async_replay(hass, _resolve_path(call.data["file"]), call.data["realtime"])
+
+    hass.services.async_register(DOMAIN, SERVICE_REPLAY, _handle_replay, schema=REPLAY_SCHEMA)
+
+    async def _handle_bulk_command(call: ServiceCall) -> ServiceResponse:
+        from .helpers.bulk import async_bulk_command
+        results = await async_bulk_command(hass, call.data["targets"], call.data["max_parallel"])
+        return {"results": results}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BULK_COMMAND, _handle_bulk_command,
+        schema=BULK_COMMAND_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _handle_dump_trace(call: ServiceCall) -> ServiceResponse:
+        from .helpers.trace import TRACE
+        path = _resolve_path(call.data["file"])
+        records = await hass.async_add_executor_job(TRACE.dump, path)
+        _LOGGER.info("[%s] 🧾 Dumped %s traced requests to %s", DOMAIN, records, path)
+        return {"records": records, "file": path}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_DUMP_TRACE, _handle_dump_trace,
+        schema=DUMP_TRACE_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
 # ------------------------------------------------------------------------------
 # ✅ Unload cleanly
 # ------------------------------------------------------------------------------
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload cleanly."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+
+    # 🧹 Stop timers and drain in-flight polls / commands before the entities go away
+    if data.get("lifecycle"):
+        await data["lifecycle"].async_shutdown()
+
+    platforms = data.get("platforms", PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
     if unload_ok:
-        hass.data.pop(DOMAIN, None)
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_REPLAY)
+            hass.services.async_remove(DOMAIN, SERVICE_BULK_COMMAND)
+            hass.services.async_remove(DOMAIN, SERVICE_DUMP_TRACE)
+            hass.data.pop(DOMAIN, None)
     return unload_ok
 
 # ------------------------------------------------------------------------------
 # ✅ Secrets check (executor safe)
 # ------------------------------------------------------------------------------
-def _check_secrets() -> dict | None:
+def _check_secrets(secrets_file: str) -> dict | None:
     """Check secrets file directly, safe for executor only."""
-    if not os.path.isfile(SECRETS_FILE):
-        _LOGGER.error("[%s] ❌ Missing %s", DOMAIN, SECRETS_FILE)
+    import yaml  # deferred: only needed in the executor
+
+    if not os.path.isfile(secrets_file):
+        _LOGGER.error("[%s] ❌ Missing %s", DOMAIN, secrets_file)
         return None
 
     try:
-        with open(SECRETS_FILE, "r") as f:
+        with open(secrets_file, "r") as f:
             secrets = yaml.safe_load(f) or {}
 
         client_id = secrets.get("client_id")
         client_secret = secrets.get("client_secret")
         base_url = secrets.get("base_url")
         token_refresh = secrets.get("token_refresh", 110)
+        record_file = secrets.get("record_file")
+        command_queue_max_age = secrets.get("command_queue_max_age")
+        worker_process = bool(secrets.get("worker_process", False))
+        online_check_interval = int(secrets.get("online_check_interval", 0))
+        hedge_status_reads = bool(secrets.get("hedge_status_reads", False))
 
         if not client_id or not client_secret or not base_url:
-            _LOGGER.error("[%s] ❌ Required fields missing in %s", DOMAIN, SECRETS_FILE)
+            _LOGGER.error("[%s] ❌ Required fields missing in %s", DOMAIN, secrets_file)
             return None
 
         return {
@@ -159,8 +337,18 @@ def _check_secrets() -> dict | None:
             "client_secret": client_secret,
             "base_url": base_url,
             "token_refresh": token_refresh,
+            "record_file": record_file,
+            "command_queue_max_age": command_queue_max_age,
+            "worker_process": worker_process,
+            "online_check_interval": online_check_interval,
+            "hedge_status_reads": hedge_status_reads,
         }
 
     except Exception as e:
-        _LOGGER.exception("[%s] ❌ Error loading %s: %s", DOMAIN, SECRETS_FILE, e)
+        _LOGGER.exception("[%s] ❌ Error loading %s: %s", DOMAIN, secrets_file, e)
         return None
+
+
+def _resolve_path(path: str) -> str:
+    """Relative paths are taken from the integration's config/ folder."""
+    return path if os.path.isabs(path) else os.path.join(CONFIG_PATH, path)
@@ -3,19 +3,15 @@
 import logging
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from .const import DOMAIN
-from .helpers.helper import build_entity_attrs, build_device_info
+from .helpers.helper import build_entity_attrs, build_device_info, get_entry_data
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Tuya Cloud Custom binary sensors."""
-    devices = hass.data[DOMAIN]["devices"]
-    sensors = []
-    for device in devices:
-        for dp in device.get("entities", []):
-            if dp.get("platform") == "binary_sensor" and dp.get("enabled", True):
-                sensors.append(TuyaCloudBinarySensor(hass, device, dp))
+    index = hass.data[DOMAIN][config_entry.entry_id]["platform_index"]
+    sensors = [TuyaCloudBinarySensor(hass, device, dp) for device, dp in index.get("binary_sensor", [])]
     async_add_entities(sensors)
     _LOGGER.info("[%s] ✅ Registered %s binary sensors", DOMAIN, len(sensors))
 
@@ -26,6 +22,7 @@ class TuyaCloudBinarySensor(BinarySensorEntity):
     def __init__(self, hass, device, dp):
         self._hass = hass
         self._device = device
+        self._data = get_entry_data(hass, device["tuya_device_id"])
         self._dp = dp
         self._state = False
 
@@ -46,7 +43,7 @@ class TuyaCloudBinarySensor(BinarySensorEntity):
         self._dp_type = dp.get("type", "boolean")
 
         key = (device["tuya_device_id"], dp["code"])
-        self._hass.data[DOMAIN]["entities"][key] = self
+        self._data["entities"][key] = self
 
         _LOGGER.debug("[%s] ✅ Registered binary sensor entity: %s | on_value=%s", DOMAIN, key, self._on_value)
 
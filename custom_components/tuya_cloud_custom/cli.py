@@ -0,0 +1,237 @@
+"""
+Tuya Cloud Custom: Command line client
+--------------------------------------
+Runs the integration's cloud code without Home Assistant, for capacity
+planning and checking a fleet before deploying.
+
+  python custom_components/tuya_cloud_custom/cli.py status [--concurrency 8] [--output status.jsonl]
+  python custom_components/tuya_cloud_custom/cli.py command --target DEVICE_ID CODE VALUE [--target ...]
+  python custom_components/tuya_cloud_custom/cli.py command --file targets.json [--concurrency 8]
+  python custom_components/tuya_cloud_custom/cli.py token
+
+Uses config/secrets[_<project>].yaml, tuya_token[_<project>].json and
+config/devices/ exactly like the integration (`--project` picks the project,
+`--config` another config folder).
+A missing or expired token is refreshed once before any device is contacted.
+Every run ends with per-phase timings (sign / HTTP / total, p50 / p95 / max).
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+# Run as a script: the package folder must not shadow stdlib modules (select.py, ...),
+# and the helpers are imported without the Home Assistant-bound package __init__
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != _PACKAGE_DIR]
+if "tuya_cloud_custom" not in sys.modules:
+    _package = types.ModuleType("tuya_cloud_custom")
+    _package.__path__ = [_PACKAGE_DIR]
+    sys.modules["tuya_cloud_custom"] = _package
+
+from tuya_cloud_custom.const import DEFAULT_PROJECT  # noqa: E402
+from tuya_cloud_custom.helpers.cloud_client import TuyaCloudClient  # noqa: E402
+from tuya_cloud_custom.helpers.device_loader import load_tuya_devices  # noqa: E402
+from tuya_cloud_custom.helpers.token_refresh import refresh_token  # noqa: E402
+from tuya_cloud_custom.helpers.trace import TRACE  # noqa: E402
+
+TOKEN_EXPIRY_MARGIN = 120  # seconds: refresh a token this close to expiry before a run
+
+
+def _project_files(args) -> tuple:
+    """Same names as the integration: the default project has no suffix."""
+    suffix = "" if args.project == DEFAULT_PROJECT else f"_{args.project}"
+    return (os.path.join(args.config, f"secrets{suffix}.yaml"),
+            os.path.join(args.config, f"tuya_token{suffix}.json"))
+
+
+def _token_expired(token_file: str) -> bool:
+    """True if there is no usable token: missing, unreadable, or past its expire_time."""
+    try:
+        with open(token_file, "r") as f:
+            token = json.load(f)
+        saved = os.path.getmtime(token_file)
+    except (OSError, ValueError):
+        return True
+    if not token.get("access_token"):
+        return True
+    # Tuya's expire_time is the token's lifetime in seconds, counted from when it was saved
+    return time.time() > saved + int(token.get("expire_time") or 0) - TOKEN_EXPIRY_MARGIN
+
+
+def _client(args) -> TuyaCloudClient:
+    import yaml
+
+    secrets_file, token_file = _project_files(args)
+    if not os.path.isfile(secrets_file):
+        raise SystemExit(f"❌ Missing {secrets_file}")
+    with open(secrets_file, "r") as f:
+        secrets = yaml.safe_load(f) or {}
+    # Refresh once up front, so an expired token does not fail every target
+    if _token_expired(token_file) and not refresh_token(secrets_file, token_file):
+        raise SystemExit(f"❌ Could not obtain a Tuya access token for {secrets_file} (see the log above)")
+    return TuyaCloudClient.from_secrets(secrets, token_file)
+
+
+def _devices(args) -> list:
+    return [
+        d for d in load_tuya_devices(os.path.join(args.config, "devices"))
+        if d.get("project", DEFAULT_PROJECT) == args.project and d.get("enabled", True)
+    ]
+
+
+def _parse_value(raw: str):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+# ------------------------------------------------------------------------------
+# Commands
+# ------------------------------------------------------------------------------
+def cmd_status(args) -> int:
+    started = time.monotonic()
+    devices = _devices(args)
+    loaded = time.monotonic()
+    client = _client(args)
+
+    def _fetch(device):
+        tuya_id = device["tuya_device_id"]
+        try:
+            body = client.get_status(tuya_id).json()
+        except Exception as e:
+            return {"device": tuya_id, "error": str(e)}
+        if not body.get("success"):
+            return {"device": tuya_id, "error": body.get("msg"), "code": body.get("code")}
+        return {"device": tuya_id, "status": body["result"]}
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(_fetch, devices))
+    fetched = time.monotonic()
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in results:
+            out.write(json.dumps(result, separators=(",", ":")) + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+    failed = sum(1 for r in results if "error" in r)
+    print(f"📊 {len(results) - failed}/{len(results)} devices OK", file=sys.stderr)
+    _report({"load devices": loaded - started, "fetch all": fetched - loaded}, len(results))
+    client.close()
+    return 1 if failed else 0
+
+
+def cmd_command(args) -> int:
+    targets = [{"device_id": d, "code": c, "value": _parse_value(v)} for d, c, v in args.target or []]
+    if args.file:
+        with open(args.file, "r") as f:
+            targets.extend(json.load(f))
+    if not targets:
+        print("❌ No targets (use --target or --file)", file=sys.stderr)
+        return 2
+
+    grouped = {}
+    for target in targets:
+        grouped.setdefault(target["device_id"], []).append({"code": target["code"], "value": target["value"]})
+
+    client = _client(args)
+    started = time.monotonic()
+
+    def _send(item):
+        tuya_id, commands = item
+        try:
+            body = client.send_commands(tuya_id, commands).json()
+        except Exception as e:
+            return {"device": tuya_id, "commands": commands, "error": str(e)}
+        if not body.get("success"):
+            return {"device": tuya_id, "commands": commands, "error": body.get("msg"), "code": body.get("code")}
+        return {"device": tuya_id, "commands": commands, "success": True}
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(_send, grouped.items()))
+
+    for result in results:
+        print(json.dumps(result, separators=(",", ":")))
+    failed = sum(1 for r in results if "error" in r)
+    print(f"📤 {len(results) - failed}/{len(results)} devices accepted {len(targets)} commands", file=sys.stderr)
+    _report({"send all": time.monotonic() - started}, len(results))
+    client.close()
+    return 1 if failed else 0
+
+
+def cmd_token(args) -> int:
+    secrets_file, token_file = _project_files(args)
+    if not os.path.isfile(secrets_file):
+        raise SystemExit(f"❌ Missing {secrets_file}")
+    started = time.monotonic()
+    ok = refresh_token(secrets_file, token_file)
+    print(f"🔑 Token {'saved to ' + token_file if ok else 'refresh FAILED'}", file=sys.stderr)
+    _report({"token": time.monotonic() - started}, 1)
+    return 0 if ok else 1
+
+
+# ------------------------------------------------------------------------------
+# Timing report
+# ------------------------------------------------------------------------------
+def _percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+
+def _report(phases: dict, count: int):
+    for name, seconds in phases.items():
+        print(f"⏱️ {name}: {seconds:.3f}s", file=sys.stderr)
+    if "fetch all" in phases or "send all" in phases:
+        wall = phases.get("fetch all") or phases.get("send all")
+        print(f"⏱️ throughput: {count / wall if wall else 0:.1f} devices/s", file=sys.stderr)
+
+    entries = TRACE.entries()
+    for kind in sorted({e["kind"] for e in entries}):
+        rows = [e for e in entries if e["kind"] == kind]
+        print(f"⏱️ {kind} ({len(rows)} requests, {sum(1 for e in rows if e['error'] or e['code'])} failed):",
+              file=sys.stderr)
+        for phase in ("sign_ms", "http_ms", "total_ms"):
+            values = [e[phase] for e in rows]
+            print(f"     {phase:<9} p50 {_percentile(values, 0.5):8.1f}  p95 {_percentile(values, 0.95):8.1f}"
+                  f"  max {max(values):8.1f}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="tuya_cloud_custom", description="Tuya Cloud Custom without Home Assistant")
+    parser.add_argument("--project", default=DEFAULT_PROJECT, help="Tuya project (config entry) to use")
+    parser.add_argument("--config", default=os.path.join(_PACKAGE_DIR, "config"), help="config folder")
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    status = sub.add_parser("status", help="read the status of every enabled device")
+    status.add_argument("--concurrency", type=int, default=8)
+    status.add_argument("--output", help="write JSON lines here instead of stdout")
+    status.set_defaults(func=cmd_status)
+
+    command = sub.add_parser("command", help="send commands; targets for the same device are merged")
+    command.add_argument("--target", nargs=3, action="append", metavar=("DEVICE_ID", "CODE", "VALUE"),
+                         help="VALUE is parsed as JSON when possible (true, 25, \"auto\")")
+    command.add_argument("--file", help="JSON list of {device_id, code, value}")
+    command.add_argument("--concurrency", type=int, default=8)
+    command.set_defaults(func=cmd_command)
+
+    token = sub.add_parser("token", help="refresh (or request) the access token")
+    token.set_defaults(func=cmd_token)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format="%(levelname)s %(name)s: %(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
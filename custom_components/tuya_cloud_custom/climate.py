@@ -6,20 +6,17 @@ from homeassistant.components.climate.const import HVACMode, ClimateEntityFeatur
 from homeassistant.const import UnitOfTemperature
 
 from .const import DOMAIN
-from .helpers.helper import build_entity_attrs, build_device_info
+from .helpers.helper import build_entity_attrs, build_device_info, get_entry_data, sanitize, skip_if_unchanged_age, is_redundant_command
 from .helpers.tuya_command import send_tuya_command
+from .helpers.debounce import CommandDebouncer
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Initialize the Climate platform."""
-    devices = hass.data[DOMAIN]["devices"]
-    climates = []
-    for device in devices:
-        for dp in device.get("entities", []):
-            if dp.get("platform") == "climate" and dp.get("enabled", True):
-                climates.append(TuyaCloudClimate(hass, device, dp))
+    index = hass.data[DOMAIN][config_entry.entry_id]["platform_index"]
+    climates = [TuyaCloudClimate(hass, device, dp) for device, dp in index.get("climate", [])]
     async_add_entities(climates)
     _LOGGER.info("[%s] ✅ Registered %s climates", DOMAIN, len(climates))
 
@@ -27,9 +24,13 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 class TuyaCloudClimate(ClimateEntity):
     """Robust Tuya Cloud Custom Climate with scale and conversion."""
 
+    # Status passes {"code", "value"} because one climate owns several DPs
+    _multi_dp = True
+
     def __init__(self, hass, device, dp):
         self._hass = hass
         self._device = device
+        self._data = get_entry_data(hass, device["tuya_device_id"])
         self._dp = dp
 
         attrs = build_entity_attrs(device, dp, "climate")
@@ -52,6 +53,7 @@ class TuyaCloudClimate(ClimateEntity):
 
         # ✅ Passive flag
         self._is_passive = dp.get("is_passive_entity", False)
+        self._skip_age = skip_if_unchanged_age(dp)
 
         # 🔑 Target temperature config
         self._has_target_temperature = "target_temperature" in dp
@@ -80,14 +82,25 @@ class TuyaCloudClimate(ClimateEntity):
         self._mode_value = None
         self._switch_state = None
 
+        # ⏳ Optional debounce window (seconds) for target temperature
+        self._debouncer = None
+        if self._has_target_temperature and dp.get("debounce"):
+            self._debouncer = CommandDebouncer(
+                hass, float(dp["debounce"]), self._async_send_target, self._attr_unique_id
+            )
+
         # ✅ Register for push updates
         tid = device["tuya_device_id"]
-        hass.data[DOMAIN]["entities"][(tid, dp["current_temperature"]["code"])] = self
+        self._data["entities"][(tid, dp["current_temperature"]["code"])] = self
         if self._has_target_temperature:
-            hass.data[DOMAIN]["entities"][(tid, dp["target_temperature"]["code"])] = self
-        hass.data[DOMAIN]["entities"][(tid, self._hvac_code)] = self
+            self._data["entities"][(tid, dp["target_temperature"]["code"])] = self
+        self._data["entities"][(tid, self._hvac_code)] = self
         if self._switch:
-            hass.data[DOMAIN]["entities"][(tid, self._switch["code"])] = self
+            self._data["entities"][(tid, self._switch["code"])] = self
+
+        # 🔁 Mirrored sensors look their source up here and register in data["mirrors"]
+        self._mirror_key = (tid, dp.get("_base_id") or sanitize(dp.get("unique_id", "unknown")))
+        self._data.setdefault("climates", {})[self._mirror_key] = self
 
         _LOGGER.debug("[%s] ✅ Registered robust climate: %s | scale=%s | temp_convert=%s | passive=%s",
                       DOMAIN, self._attr_unique_id, self._scale, self._temp_convert, self._is_passive)
@@ -131,55 +144,57 @@ class TuyaCloudClimate(ClimateEntity):
 
         value = int(temp_to_send * self._scale)
 
+        if self._debouncer:
+            self._target_temp = new_temp
+            self.async_write_ha_state()
+            self._debouncer.async_schedule(value)
+            return
+
+        await self._async_send_target(value)
+
+        self._target_temp = new_temp
+        self.async_write_ha_state()
+
+    async def _async_send_target(self, value):
+        """Send the raw (scaled) target temperature DP."""
+        await self._async_send(self._dp["target_temperature"]["code"], value)
+
+    async def _async_send(self, dp_code, value):
+        """Send one DP command unless it would be a no-op (skip_if_unchanged)."""
+        tid = self._device["tuya_device_id"]
+        if is_redundant_command(self._hass, tid, dp_code, value, self._skip_age):
+            return
         await self._hass.async_add_executor_job(
             send_tuya_command,
             self._hass,
-            self._device["tuya_device_id"],
-            self._dp["target_temperature"]["code"],
+            tid,
+            dp_code,
             value
         )
 
-        self._target_temp = new_temp
-        self.async_write_ha_state()
-
     async def async_set_hvac_mode(self, hvac_mode):
         """Set the HVAC mode, handling passive and switch overrides."""
         if self._is_passive:
             _LOGGER.info("[%s] 🚫 Climate %s is passive — hvac_mode not sent", DOMAIN, self._attr_unique_id)
             return
 
-        tid = self._device["tuya_device_id"]
-
         if hvac_mode == HVACMode.OFF:
             if self._switch:
-                await self._hass.async_add_executor_job(
-                    send_tuya_command,
-                    self._hass,
-                    tid,
-                    self._switch["code"],
-                    False
-                )
+                await self._async_send(self._switch["code"], False)
         else:
             if self._switch:
-                await self._hass.async_add_executor_job(
-                    send_tuya_command,
-                    self._hass,
-                    tid,
-                    self._switch["code"],
-                    True
-                )
+                await self._async_send(self._switch["code"], True)
             tuya_mode = self._ha_to_tuya.get(hvac_mode)
             if tuya_mode:
-                await self._hass.async_add_executor_job(
-                    send_tuya_command,
-                    self._hass,
-                    tid,
-                    self._hvac_code,
-                    tuya_mode
-                )
+                await self._async_send(self._hvac_code, tuya_mode)
 
         self.async_write_ha_state()
 
+    async def async_will_remove_from_hass(self):
+        """Drop pending debounced setpoints."""
+        if self._debouncer:
+            self._debouncer.async_cancel()
+
     async def async_update(self):
         """Polling not used — Tuya cloud sends updates via websocket."""
         pass
@@ -217,3 +232,6 @@ class TuyaCloudClimate(ClimateEntity):
         _LOGGER.debug("[%s] ✅ Climate %s DP %s = %s (scale=%s)",
                       DOMAIN, self._attr_unique_id, dp_code, val, self._scale)
         self.async_write_ha_state()
+
+        for mirror in self._data.get("mirrors", {}).get(self._mirror_key, ()):
+            mirror.async_update_from_climate(self)
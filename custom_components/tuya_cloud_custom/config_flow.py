@@ -1,18 +1,36 @@
+import re
+import voluptuous as vol
+
 from homeassistant import config_entries
 
-from .const import DOMAIN  # reuse same domain
+from .const import DOMAIN, DEFAULT_PROJECT  # reuse same domain
 
 class TuyaCloudCustomConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
-    """Handle a config flow for Tuya Cloud Custom."""
+    """Handle a config flow for Tuya Cloud Custom (one entry per Tuya cloud project)."""
 
     VERSION = 1
 
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
-        if self._async_current_entries():
-            return self.async_abort(reason="single_instance_allowed")
+        errors = {}
 
         if user_input is not None:
-            return self.async_create_entry(title="Tuya Cloud Custom", data={})
+            project = user_input.get("project", DEFAULT_PROJECT).strip().lower()
+            if not re.fullmatch(r"[a-z0-9_]+", project):
+                errors["project"] = "invalid_project"
+            else:
+                await self.async_set_unique_id(project)
+                self._abort_if_unique_id_configured()
+                # Entries created before unique ids were set only carry the project in their data
+                for existing in self._async_current_entries():
+                    if existing.data.get("project", DEFAULT_PROJECT) == project:
+                        return self.async_abort(reason="already_configured")
+
+                title = "Tuya Cloud Custom" if project == DEFAULT_PROJECT else f"Tuya Cloud Custom ({project})"
+                return self.async_create_entry(title=title, data={"project": project})
 
-        return self.async_show_form(step_id="user")
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema({vol.Required("project", default=DEFAULT_PROJECT): str}),
+            errors=errors,
+        )
@@ -4,6 +4,9 @@
 DOMAIN = "tuya_cloud_custom"
 VERSION = "2.0.1"
 
+# Config entry / device YAML project used when none is given
+DEFAULT_PROJECT = "default"
+
 # Valid HA entity categories
 VALID_ENTITY_CATEGORIES = {
     "config",
@@ -29,3 +32,61 @@ VALID_SENSOR_CLASSES = {
 
 # Supported platforms
 SUPPORTED_PLATFORMS = {"switch", "sensor", "number", "climate"}
+
+# Optimistic entities: wait before the confirmation read (seconds)
+OPTIMISTIC_CONFIRM_DELAY = 5
+
+# restore_on_reconnect: seconds between per-device restore commands at startup
+RESTORE_STAGGER = 2
+
+# Offline command queue: drop queued commands older than this (seconds)
+COMMAND_QUEUE_MAX_AGE = 900
+# Offline command queue: how often to probe the cloud while commands are waiting (seconds)
+COMMAND_QUEUE_RETRY_INTERVAL = 60
+
+# skip_if_unchanged: true → trust the last polled value for this long (seconds)
+SKIP_IF_UNCHANGED_MAX_AGE = 300
+
+# Startup warm-up fetch: parallel requests and minimum spacing between starts (seconds)
+WARMUP_CONCURRENCY = 4
+WARMUP_SPACING = 0.25
+
+# Last-known DP snapshot: write-behind interval (seconds)
+SNAPSHOT_INTERVAL = 60
+
+# Local LAN transport: TCP port, per-request timeout and how long to use the cloud after a failure (seconds)
+LOCAL_PORT = 6668
+LOCAL_TIMEOUT = 3
+LOCAL_RETRY_AFTER = 60
+
+# Online check: device ids per batch request
+ONLINE_CHECK_BATCH = 20
+
+# Request trace: number of cloud calls kept in the in-memory ring buffer
+TRACE_SIZE = 2000
+
+# Load shedding: loop lag (seconds) / executor queue depth above which routine polls are thinned out
+LOAD_PROBE_INTERVAL = 1
+LOAD_LAG_THRESHOLD = 0.5
+LOAD_EXECUTOR_THRESHOLD = 20
+# Load shedding: a device's poll is never skipped more than this many times in a row
+LOAD_MAX_SKIPS = 3
+
+# Report-log backfill: run interval, first-run look-back and page size
+BACKFILL_INTERVAL = 3600
+BACKFILL_INITIAL_LOOKBACK = 86400
+BACKFILL_PAGE_SIZE = 100
+
+# Cloud worker: wait for a command reply, then how long a timed-out command may still report its outcome (seconds)
+WORKER_COMMAND_TIMEOUT = 15
+WORKER_CANCEL_WAIT = 15
+
+# Config entry unload: how long in-flight polls / commands may finish before they are cancelled (seconds)
+LIFECYCLE_DRAIN_TIMEOUT = 10
+
+# Hedged status reads: hedges allowed per status read, and how many may be saved up
+HEDGE_MAX_RATIO = 0.1
+HEDGE_BURST = 3
+# Hedged status reads: response times kept per endpoint, and how many are needed before hedging starts
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
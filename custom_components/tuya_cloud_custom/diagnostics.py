@@ -0,0 +1,32 @@
+"""Tuya Cloud Custom: config entry diagnostics (no secrets, no device keys)."""
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .helpers.cloud_client import STATUS_ENDPOINT
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Active timers / tasks and poller health of one project."""
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    status = data.get("status")
+    lifecycle = data.get("lifecycle")
+    client = data.get("client")
+
+    return {
+        "project": data.get("project"),
+        "devices": len(data.get("devices", [])),
+        "entities": len(data.get("entities", {})),
+        "platforms": data.get("platforms", []),
+        "worker_process": bool(data.get("worker")),
+        "lifecycle": lifecycle.report() if lifecycle else None,
+        "status": {
+            "warmup_seconds": status.warmup_seconds,
+            "offline_devices": sum(1 for online in status.online.values() if not online),
+            "loop_lag": round(status.load.lag, 3),
+            "polls_shed": status.load.shed,
+            "status_p95": client.latency_p95(STATUS_ENDPOINT) if client else None,
+            "hedge": status.hedge.stats() if status.hedge else None,
+        } if status else None,
+    }
@@ -0,0 +1,199 @@
+"""
+Tuya Cloud Custom: Report-log backfill into long-term statistics
+----------------------------------------------------------------
+Sensors with `backfill: true` get their full-resolution history from Tuya's
+device report logs (GET /v1.0/devices/{id}/logs, type 7 = DP report) instead
+of faster polling.
+
+Every BACKFILL_INTERVAL the logs since the device's cursor are fetched (codes
+of all backfilled DPs in one query, paged), aggregated per complete hour into
+mean / min / max, and imported in one call per DP as external statistics
+`tuya_cloud_custom:<tuya_id>_<code>` — no state writes. The cursor only moves
+over complete hours, so an hour is never imported half-filled, and is
+persisted in config/backfill_cursor.json.
+
+Report logs are change events, not samples: a value holds until the next
+event. The mean is weighted by how long each value held, the value at the
+cursor is carried into the next hour (and the next run), and every hour with
+a known value gets a row, changed or not.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from ..const import DOMAIN, BACKFILL_INITIAL_LOOKBACK, BACKFILL_PAGE_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR_MS = 3600 * 1000
+
+
+class ReportLogBackfill:
+    """Incremental report-log → statistics importer for one project."""
+
+    def __init__(self, hass, data: dict, cursor_file: str):
+        self.hass = hass
+        self.data = data
+        self.cursor_file = cursor_file
+        self.cursors = {}  # tuya_id → ms timestamp up to which logs were imported
+        self.last = {}  # tuya_id → {code: value held at the cursor}
+        self._loaded = False
+
+        # tuya_id → {code: dp}
+        self.targets = {}
+        for device in data["devices"]:
+            if not device.get("enabled", True):
+                continue
+            for dp in device.get("entities", []):
+                if dp.get("backfill") and dp.get("platform") == "sensor" and dp.get("enabled", True):
+                    self.targets.setdefault(device["tuya_device_id"], {})[dp["code"]] = dp
+
+    async def async_run(self, _now=None):
+        """Backfill every target device up to the last complete hour."""
+        if not self.targets:
+            return
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.warning("[%s] ⚠️ Backfill needs the recorder integration — skipped", DOMAIN)
+            return
+        status = self.data.get("status")
+        if _now is not None and status and status.load.overloaded():
+            return  # routine run; the next interval catches up
+
+        if not self._loaded:
+            self.cursors, self.last = await self.hass.async_add_executor_job(self._read_cursors)
+            self._loaded = True
+
+        end_ms = int(time.time() * 1000) // HOUR_MS * HOUR_MS
+        imported = 0
+        for tuya_id, codes in self.targets.items():
+            start_ms = self.cursors.get(tuya_id, end_ms - BACKFILL_INITIAL_LOOKBACK * 1000)
+            if start_ms >= end_ms:
+                continue
+
+            logs = await self.hass.async_add_executor_job(self._fetch_logs, tuya_id, list(codes), start_ms, end_ms)
+            if logs is None:
+                continue  # keep the cursor, retry next run
+
+            last = self.last.setdefault(tuya_id, {})
+            for code, dp in codes.items():
+                hours, last[code] = _aggregate_hourly(
+                    [log for log in logs if log["code"] == code], start_ms, end_ms, last.get(code)
+                )
+                if hours:
+                    self._import(tuya_id, code, dp, hours)
+                    imported += len(hours)
+                if last[code] is None:
+                    del last[code]
+            self.cursors[tuya_id] = end_ms
+
+        await self.hass.async_add_executor_job(self._write_cursors)
+        _LOGGER.info("[%s] 📈 Backfill imported %s hourly statistics for %s devices",
+                     DOMAIN, imported, len(self.targets))
+
+    def _import(self, tuya_id: str, code: str, dp: dict, hours: list):
+        from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        metadata = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": f"{tuya_id} {dp.get('name') or dp.get('_auto_name') or code}",
+            "source": DOMAIN,
+            "statistic_id": f"{DOMAIN}:{tuya_id.lower()}_{dp.get('_base_id') or code.lower()}",
+            "unit_of_measurement": dp.get("unit_of_measurement"),
+        }
+        try:
+            from homeassistant.components.recorder.models import StatisticMeanType
+            metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+        except ImportError:
+            pass  # older HA: has_mean is enough
+
+        stats = [
+            StatisticData(start=datetime.fromtimestamp(start / 1000, timezone.utc), mean=mean, min=low, max=high)
+            for start, mean, low, high in hours
+        ]
+        async_add_external_statistics(self.hass, StatisticMetaData(**metadata), stats)
+
+    def _fetch_logs(self, tuya_id: str, codes: list, start_ms: int, end_ms: int) -> list | None:
+        """All DP report logs in [start_ms, end_ms) for the codes (executor only)."""
+        logs, row_key = [], None
+        while True:
+            params = {"codes": ",".join(codes), "end_time": end_ms - 1, "size": BACKFILL_PAGE_SIZE,
+                      "start_time": start_ms, "type": 7}
+            if row_key:
+                params["start_row_key"] = row_key
+            # Tuya signs the query string with its keys in sorted order
+            query = "&".join(f"{key}={params[key]}" for key in sorted(params))
+            url_path = f"/v1.0/devices/{tuya_id}/logs?{query}"
+            try:
+                result = self.data["client"].get_result(url_path, kind="logs", device=tuya_id) or {}
+            except Exception as e:
+                _LOGGER.warning("[%s] ⚠️ Report log fetch failed for %s: %s", DOMAIN, tuya_id, e)
+                return None
+
+            logs.extend(result.get("logs", []))
+            row_key = result.get("next_row_key")
+            if not result.get("has_next") or not row_key:
+                return logs
+
+    def _read_cursors(self) -> tuple:
+        """(cursors, last values); a plain {tuya_id: ms} file is the older layout."""
+        if not os.path.isfile(self.cursor_file):
+            return {}, {}
+        try:
+            with open(self.cursor_file, "r") as f:
+                data = json.load(f) or {}
+        except Exception as e:
+            _LOGGER.warning("[%s] ⚠️ Ignoring unreadable backfill cursor %s: %s", DOMAIN, self.cursor_file, e)
+            return {}, {}
+        if "cursors" not in data:
+            return data, {}
+        return data["cursors"], data.get("last", {})
+
+    def _write_cursors(self):
+        tmp = self.cursor_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"cursors": self.cursors, "last": self.last}, f, indent=2)
+        os.replace(tmp, self.cursor_file)
+
+
+def _aggregate_hourly(logs: list, start_ms: int, end_ms: int, carry: float | None = None) -> tuple:
+    """Time-weighted hourly statistics of change events in [start_ms, end_ms).
+
+    `carry` is the value held at start_ms (None if unknown). Returns
+    ([(hour_start_ms, mean, min, max)], value held at end_ms), oldest first;
+    hours before the first known value are left out.
+    """
+    events = []
+    for log in logs:
+        try:
+            event_time, value = int(log["event_time"]), float(log["value"])
+        except (TypeError, ValueError, KeyError):
+            continue
+        if start_ms <= event_time < end_ms:
+            events.append((event_time, value))
+    events.sort(key=lambda e: e[0])
+
+    hours, value, i = [], carry, 0
+    for hour in range(start_ms // HOUR_MS * HOUR_MS, end_ms, HOUR_MS):
+        hour_end = min(hour + HOUR_MS, end_ms)
+        since = max(hour, start_ms)
+        weighted, held, seen = 0.0, 0, [] if value is None else [value]
+        while i < len(events) and events[i][0] < hour_end:
+            event_time, new_value = events[i]
+            if value is not None:
+                weighted += value * (event_time - since)
+                held += event_time - since
+            value, since = new_value, event_time
+            seen.append(value)
+            i += 1
+        if value is None:
+            continue
+        weighted += value * (hour_end - since)
+        held += hour_end - since
+        mean = weighted / held if held else value
+        hours.append((hour, mean, min(seen), max(seen)))
+    return hours, value
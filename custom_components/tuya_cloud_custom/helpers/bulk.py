@@ -0,0 +1,87 @@
+"""
+Tuya Cloud Custom: Bulk command fan-out
+---------------------------------------
+Backs the `tuya_cloud_custom.bulk_command` service.
+
+- Targets for the same device are merged into one multi-DP POST.
+- Devices are sent in parallel, bounded by `max_parallel`.
+- Every target gets its own result entry.
+"""
+
+import asyncio
+import logging
+import time
+
+from ..const import DOMAIN
+from .tuya_command import send_tuya_commands
+from .helper import get_entry_data
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_bulk_command(hass, targets: list, max_parallel: int = 8) -> list:
+    """Send all targets and return one result dict per target, in input order."""
+    results = [
+        {"device_id": t["device_id"], "code": t["code"], "value": t["value"], "success": False}
+        for t in targets
+    ]
+
+    # 🧺 Group per device, keeping the caller's order inside each device
+    per_device = {}
+    for idx, target in enumerate(targets):
+        tuya_id = target["device_id"]
+        data = get_entry_data(hass, tuya_id)
+        if data is None:
+            results[idx]["error"] = "unknown device"
+            continue
+        entity = data["entities"].get((tuya_id, target["code"]))
+        if entity is not None and getattr(entity, "_is_passive", False):
+            results[idx]["error"] = "passive entity"
+            continue
+        per_device.setdefault(tuya_id, []).append(idx)
+
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def _send(tuya_id, indexes):
+        commands = [{"code": targets[i]["code"], "value": targets[i]["value"]} for i in indexes]
+        async with semaphore:
+            response = await hass.async_add_executor_job(send_tuya_commands, hass, tuya_id, commands)
+
+        error = None
+        queued = getattr(response, "queued", False)
+        if response is None:
+            error = "no response from Tuya cloud"
+        elif queued:
+            error = "queued until the cloud is reachable"
+        elif response.status_code != 200:
+            error = f"HTTP {response.status_code}"
+        else:
+            try:
+                body = response.json()
+            except ValueError:
+                error = "invalid JSON response"
+            else:
+                if not body.get("success"):
+                    error = f"{body.get('code')} {body.get('msg')}"
+
+        for i in indexes:
+            if error:
+                results[i]["error"] = error
+                if queued:
+                    results[i]["queued"] = True
+            else:
+                results[i]["success"] = True
+
+        # ✅ Reflect accepted values right away instead of waiting for the next poll
+        data = get_entry_data(hass, tuya_id)  # None if the entry was unloaded meanwhile
+        status = data.get("status") if data else None
+        if error is None and status:
+            await status.async_dispatch_status(tuya_id, commands, commanded=True)
+
+    started = time.monotonic()
+    await asyncio.gather(*(_send(tid, idx) for tid, idx in per_device.items()))
+
+    ok = sum(1 for r in results if r["success"])
+    _LOGGER.info("[%s] 📦 Bulk command: %s/%s targets OK across %s devices in %.2fs",
+                 DOMAIN, ok, len(results), len(per_device), time.monotonic() - started)
+    return results
@@ -0,0 +1,109 @@
+"""
+Tuya Cloud Custom: Headless Tuya cloud client
+---------------------------------------------
+Signed Tuya OpenAPI calls with no Home Assistant imports: status reads,
+commands, token requests and any other GET. Status, send_tuya_commands,
+token refresh, the spec cache, backfill, the cloud worker and the CLI
+(cli.py) all go through it, and every call lands in the request trace.
+Response times of templated endpoints are kept for latency_p95() (hedging).
+
+Blocking — call from the executor, a worker process or a plain script.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+from ..const import HEDGE_WINDOW, HEDGE_MIN_SAMPLES
+from .signing import read_access_token, signed_headers
+from .trace import TRACE
+
+STATUS_ENDPOINT = "/v1.0/devices/{id}/status"
+COMMAND_ENDPOINT = "/v1.0/devices/{id}/commands"
+
+
+class TuyaCloudClient:
+    """One Tuya cloud project: credentials, token file and a shared HTTP session."""
+
+    def __init__(self, client_id: str, client_secret: str, base_url: str, token_file: str, timeout: float = 10):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url
+        self.token_file = token_file
+        self.timeout = timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._latency = {}  # endpoint template → deque of recent response times (seconds)
+
+    @classmethod
+    def from_secrets(cls, secrets: dict, token_file: str) -> "TuyaCloudClient":
+        return cls(secrets["client_id"], secrets["client_secret"], secrets["base_url"], token_file)
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    self._session = requests.Session()
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    # --------------------------------------------------------------------------
+    def request(self, method: str, url_path: str, body=None, *, kind: str = "api", device=None,
+                endpoint: str | None = None, attempt: int = 1, auth: bool = True):
+        """Signed request; returns the requests.Response or raises RequestException.
+
+        endpoint is what the trace stores — pass a template when url_path holds a secret.
+        """
+        import requests
+
+        started = signed = time.monotonic()
+        content = json.dumps(body) if body is not None else ""
+        try:
+            access_token = read_access_token(self.token_file) if auth else ""
+            headers = signed_headers(self.client_id, self.client_secret, access_token, method, url_path, content)
+            signed = time.monotonic()
+            response = self.session.request(method, f"{self.base_url}{url_path}", headers=headers,
+                                            data=content or None, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            TRACE.add(kind, device, endpoint or url_path, attempt, started, signed, error=e)
+            raise
+        TRACE.add(kind, device, endpoint or url_path, attempt, started, signed, response)
+        if endpoint:
+            self._latency.setdefault(endpoint, deque(maxlen=HEDGE_WINDOW)).append(time.monotonic() - signed)
+        return response
+
+    def latency_p95(self, endpoint: str) -> float | None:
+        """p95 response time of the last HEDGE_WINDOW calls, or None until HEDGE_MIN_SAMPLES are in."""
+        samples = sorted(list(self._latency.get(endpoint, ())))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def get_status(self, tuya_id: str, attempt: int = 1, kind: str = "status"):
+        return self.request("GET", f"/v1.0/devices/{tuya_id}/status",
+                            kind=kind, device=tuya_id, endpoint=STATUS_ENDPOINT, attempt=attempt)
+
+    def send_commands(self, tuya_id: str, commands: list):
+        return self.request("POST", f"/v1.0/devices/{tuya_id}/commands", {"commands": commands},
+                            kind="command", device=tuya_id, endpoint=COMMAND_ENDPOINT)
+
+    def get_result(self, url_path: str, kind: str = "api", device=None):
+        """GET and return `result` on success, or raise ValueError with Tuya's message."""
+        body = self.request("GET", url_path, kind=kind, device=device).json()
+        if not body.get("success"):
+            raise ValueError(body.get("msg") or f"code {body.get('code')}")
+        return body.get("result")
+
+    def new_token(self):
+        return self.request("GET", "/v1.0/token?grant_type=1", kind="token", auth=False)
+
+    def refresh_token(self, refresh_token: str):
+        return self.request("GET", f"/v1.0/token/{refresh_token}", kind="token",
+                            endpoint="/v1.0/token/{refresh_token}", auth=False)
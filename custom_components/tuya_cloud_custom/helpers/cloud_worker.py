@@ -0,0 +1,240 @@
+"""
+Tuya Cloud Custom: Out-of-process cloud worker
+----------------------------------------------
+Optional mode (`worker_process: true` in secrets.yaml) for very large fleets.
+
+The worker process does the polling, signing and JSON decoding that Status
+and send_tuya_command normally do on the HA side. It talks to HA over a
+multiprocessing Pipe (a local socket pair):
+
+  worker → HA   ("status", tuya_id, [{"code", "value"}, ...])           changed DPs only
+                ("polled", req_id, tuya_id, [{"code", "value"}, ...])   every DP (None: failed)
+                ("result", req_id, http_status, body_text)               command reply
+                ("cancelled", req_id)                                    dropped unsent
+  HA → worker   ("command", req_id, tuya_id, [commands])
+                ("cancel", req_id)                                       HA gave up waiting
+                ("poll", req_id, tuya_id)                                poll now
+                ("stop",)
+
+Scheduled polls only report what changed since the worker's last poll. HA
+also changes entity state by itself (optimistic and commanded values), so
+a poll HA asks for answers with every DP, and a command sent through the
+worker makes the next scheduled poll of that device report every DP too.
+
+A command HA gave up on is only reported as not sent once the worker
+confirms it dropped it; a late reply still counts as sent, so nothing is
+queued twice. If the worker process dies, HA drops the bridge and goes
+back to in-process polling and commands.
+
+The worker itself lives in worker_process.py, which the child runs by path
+so that it never imports the package __init__ (and Home Assistant with it).
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+
+from ..const import DOMAIN, WORKER_COMMAND_TIMEOUT, WORKER_CANCEL_WAIT
+
+_LOGGER = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "worker_process.py")
+WORKER_RUN_NAME = "__tuya_cloud_worker__"  # __name__ of worker_process.py inside the child
+
+
+class CommandNotSent(Exception):
+    """The worker confirms the command never reached the cloud (safe to queue)."""
+
+
+class WorkerResponse:
+    """Just enough of requests.Response for the command callers."""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class CloudWorkerBridge:
+    """Starts the worker process and moves messages between it and Status."""
+
+    def __init__(self, hass, data: dict):
+        self.hass = hass
+        self.data = data
+        self._process = None
+        self._conn = None
+        self._reader = None
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._waiting = {}  # req_id → [threading.Event, outcome tuple]
+        self._stopping = False
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Spawn the worker and the reader thread (executor only)."""
+        import multiprocessing
+        import runpy
+
+        secrets = self.data["secrets"]
+        config = {
+            "base_url": secrets["base_url"],
+            "client_id": secrets["client_id"],
+            "client_secret": secrets["client_secret"],
+            "token_file": self.data["token_file"],
+            "intervals": {
+                d["tuya_device_id"]: int(d.get("poll_interval", 3600)) or 3600
+                for d in self.data["devices"] if d.get("enabled", True)
+            },
+        }
+
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        # runpy is all the child unpickles: the worker file runs without importing this package
+        self._process = ctx.Process(target=runpy.run_path, args=(WORKER_SCRIPT,),
+                                    kwargs={"init_globals": {"conn": child, "config": config},
+                                            "run_name": WORKER_RUN_NAME},
+                                    daemon=True, name=f"{DOMAIN}_worker_{self.data['project']}")
+        self._process.start()
+        child.close()
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True, name=f"{DOMAIN}_worker_reader")
+        self._reader.start()
+        _LOGGER.info("[%s] 🧵 Cloud worker started (pid %s) for %s devices",
+                     DOMAIN, self._process.pid, len(config["intervals"]))
+
+    def _read_loop(self):
+        while True:
+            try:
+                msg = self._conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if msg[0] == "status":
+                _, tuya_id, changed = msg
+                status = self.data.get("status")
+                if status:
+                    self.hass.loop.call_soon_threadsafe(
+                        self.data["lifecycle"].create_task, status.async_dispatch_status(tuya_id, changed)
+                    )
+            elif msg[0] in ("result", "cancelled", "polled"):
+                waiter = self._waiting.get(msg[1])
+                if waiter:
+                    waiter[1] = (msg[0],) + tuple(msg[2:])
+                    waiter[0].set()
+                elif msg[0] == "polled" and msg[3] is not None:
+                    # HA stopped waiting for this poll; the worker already counts it as reported
+                    _, _, tuya_id, payload = msg
+                    status = self.data.get("status")
+                    if status:
+                        self.hass.loop.call_soon_threadsafe(
+                            self.data["lifecycle"].create_task, status.async_dispatch_status(tuya_id, payload)
+                        )
+
+        # Wake anyone still waiting: their command's fate is unknown
+        for waiter in list(self._waiting.values()):
+            waiter[1] = ("exited",)
+            waiter[0].set()
+
+        if self._stopping:
+            _LOGGER.info("[%s] 🧵 Cloud worker connection closed", DOMAIN)
+            return
+        _LOGGER.error("[%s] ❌ Cloud worker exited unexpectedly — falling back to in-process polling and commands",
+                      DOMAIN)
+        self.hass.loop.call_soon_threadsafe(self._fall_back)
+
+    def _fall_back(self):
+        """Event loop: drop the dead worker so every path uses the in-process client again."""
+        if self.data.get("worker") is not self:
+            return
+        self.data.pop("worker")
+        status = self.data.get("status")
+        if status:
+            self.data["lifecycle"].create_task(status.async_fall_back_from_worker())
+
+    def _send(self, msg):
+        with self._send_lock:
+            self._conn.send(msg)
+
+    def send_commands(self, tuya_id: str, commands: list, timeout: float = WORKER_COMMAND_TIMEOUT):
+        """Blocking command round trip through the worker (executor only).
+
+        Returns a WorkerResponse once the worker sent the command (late replies
+        included). Raises CommandNotSent if it confirms the command never went
+        out. Returns None if the outcome is unknown (worker died mid-request):
+        the command may have been sent, so it must not be queued.
+        """
+        req_id = next(self._ids)
+        waiter = [threading.Event(), None]
+        self._waiting[req_id] = waiter
+        try:
+            try:
+                self._send(("command", req_id, tuya_id, commands))
+            except (OSError, ValueError) as e:
+                raise CommandNotSent(f"cloud worker not reachable: {e}") from e
+
+            if not waiter[0].wait(timeout):
+                # Too slow: drop it if still waiting in the worker, else wait for the real outcome
+                try:
+                    self._send(("cancel", req_id))
+                except (OSError, ValueError):
+                    pass
+                waiter[0].wait(WORKER_CANCEL_WAIT)
+            outcome = waiter[1]
+        finally:
+            self._waiting.pop(req_id, None)
+
+        if outcome is None or outcome[0] == "exited":
+            _LOGGER.warning("[%s] ⚠️ No reply from the cloud worker for %s %s — outcome unknown, not queued",
+                            DOMAIN, tuya_id, [c["code"] for c in commands])
+            return None
+        if outcome[0] == "cancelled":
+            raise CommandNotSent(f"no reply within {timeout}s; dropped unsent by the cloud worker")
+        _, http_status, text = outcome
+        if http_status is None:
+            raise CommandNotSent(text)  # the worker could not reach the cloud
+        return WorkerResponse(http_status, text)
+
+    def poll(self, tuya_id: str, timeout: float = WORKER_COMMAND_TIMEOUT):
+        """Blocking status read through the worker (executor only).
+
+        Returns every DP of the device, or None if the read failed or timed out.
+        """
+        req_id = next(self._ids)
+        waiter = [threading.Event(), None]
+        self._waiting[req_id] = waiter
+        try:
+            try:
+                self._send(("poll", req_id, tuya_id))
+            except (OSError, ValueError):
+                return None
+            waiter[0].wait(timeout)
+            outcome = waiter[1]
+        finally:
+            self._waiting.pop(req_id, None)
+
+        if outcome is None or outcome[0] != "polled":
+            return None
+        return outcome[2]
+
+    def stop(self):
+        """Stop the worker process (executor only)."""
+        if self._process is None:
+            return
+        self._stopping = True
+        try:
+            self._send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+        self._process = None
+        _LOGGER.info("[%s] 🧵 Cloud worker stopped", DOMAIN)
@@ -0,0 +1,196 @@
+"""
+Tuya Cloud Custom: Durable offline command queue
+------------------------------------------------
+Commands that fail for transport reasons (connection error, timeout) are kept
+in config/command_queue.json instead of being lost.
+
+- One queue per device; the latest value per DP wins.
+- Replayed in order as one multi-DP command once the device answers a poll,
+  or when the periodic probe gets through.
+- Commands older than the max age are dropped, never replayed.
+- A failed replay puts commands back without overwriting newer values.
+- send_tuya_commands returns a QueuedResponse (HTTP 202, not success) for a
+  queued command, so callers can tell "will be delivered" from "failed".
+- Replays send with queue_on_failure=False and get an UnsentResponse only for
+  transport failures; only those are put back. A local rejection or an
+  unknown outcome (the worker may have sent it) drops the commands.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from ..const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class QueuedResponse:
+    """Stand-in response for a command that went to the offline queue."""
+
+    status_code = 202
+    queued = True
+    text = '{"success": false, "queued": true, "msg": "queued until the cloud is reachable"}'
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class UnsentResponse:
+    """Stand-in response for a command that never reached the cloud (queue_on_failure=False)."""
+
+    status_code = 503
+    unsent = True
+
+    def __init__(self, reason: str):
+        self.text = json.dumps({"success": False, "msg": reason})
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class CommandQueue:
+    """Per-device DP queue persisted to disk. enqueue() is executor-safe."""
+
+    def __init__(self, hass, data: dict, path: str, max_age: int):
+        self.hass = hass
+        self.data = data  # config entry runtime data
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._queues = {}  # tuya_id → {code: {"value": v, "ts": t}} (insertion ordered)
+
+    # --------------------------------------------------------------------------
+    # Executor side
+    # --------------------------------------------------------------------------
+    def load(self):
+        """Load the persisted queue, dropping stale entries (executor only)."""
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f) or {}
+        except Exception as e:
+            _LOGGER.warning("[%s] ⚠️ Ignoring unreadable command queue %s: %s", DOMAIN, self.path, e)
+            return
+
+        with self._lock:
+            self._queues = data
+            self._drop_stale()
+            pending = sum(len(q) for q in self._queues.values())
+        if pending:
+            _LOGGER.info("[%s] 📥 Loaded %s queued commands from %s", DOMAIN, pending, self.path)
+
+    def enqueue(self, tuya_id: str, commands: list, ts: float | None = None):
+        """Queue commands for a device; a newer value for a DP replaces the old one."""
+        ts = ts or time.time()
+        with self._lock:
+            queue = self._queues.setdefault(tuya_id, {})
+            for cmd in commands:
+                queue.pop(cmd["code"], None)  # move to the end: keeps send order
+                queue[cmd["code"]] = {"value": cmd["value"], "ts": cmd.get("ts", ts)}
+            self._save()
+        _LOGGER.warning("[%s] 📥 Cloud unreachable — queued %s for %s",
+                        DOMAIN, [c["code"] for c in commands], tuya_id)
+
+    def requeue(self, tuya_id: str, commands: list):
+        """Put back commands whose replay failed; a value queued for the same DP meanwhile wins."""
+        with self._lock:
+            current = self._queues.get(tuya_id, {})
+            queue = {
+                cmd["code"]: {"value": cmd["value"], "ts": cmd["ts"]}
+                for cmd in commands
+                if cmd["code"] not in current or current[cmd["code"]]["ts"] < cmd["ts"]
+            }
+            for code, entry in current.items():  # older commands first: keeps send order
+                if code not in queue:
+                    queue[code] = entry
+            if queue:
+                self._queues[tuya_id] = queue
+            self._save()
+
+    def _pop(self, tuya_id: str) -> list:
+        with self._lock:
+            self._drop_stale()
+            queue = self._queues.pop(tuya_id, {})
+            self._save()
+        return [{"code": code, "value": e["value"], "ts": e["ts"]} for code, e in queue.items()]
+
+    def _drop_stale(self):
+        cutoff = time.time() - self.max_age
+        for tuya_id in list(self._queues):
+            queue = self._queues[tuya_id]
+            for code in [c for c, e in queue.items() if e["ts"] < cutoff]:
+                _LOGGER.warning("[%s] 🗑️ Dropped stale queued command %s.%s=%s",
+                                DOMAIN, tuya_id, code, queue[code]["value"])
+                del queue[code]
+            if not queue:
+                del self._queues[tuya_id]
+
+    def _save(self):
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._queues, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            _LOGGER.warning("[%s] ⚠️ Failed to persist command queue: %s", DOMAIN, e)
+
+    # --------------------------------------------------------------------------
+    # Event loop side
+    # --------------------------------------------------------------------------
+    def has_pending(self, tuya_id: str | None = None) -> bool:
+        if tuya_id is None:
+            return bool(self._queues)
+        return tuya_id in self._queues
+
+    def oldest_device(self) -> str | None:
+        """Device whose queue holds the oldest command (used as the probe)."""
+        oldest = None
+        for tuya_id, queue in list(self._queues.items()):
+            ts = min((e["ts"] for e in queue.values()), default=None)
+            if ts is not None and (oldest is None or ts < oldest[1]):
+                oldest = (tuya_id, ts)
+        return oldest[0] if oldest else None
+
+    async def async_replay(self, tuya_id: str) -> bool:
+        """Send a device's queued commands. Returns False if the cloud is still unreachable."""
+        from .tuya_command import send_tuya_commands
+
+        queued = await self.hass.async_add_executor_job(self._pop, tuya_id)
+        if not queued:
+            return True
+
+        commands = [{"code": c["code"], "value": c["value"]} for c in queued]
+        response = await self.hass.async_add_executor_job(
+            send_tuya_commands, self.hass, tuya_id, commands, False
+        )
+
+        if getattr(response, "unsent", False):
+            # Still offline — put them back with their original timestamps
+            await self.hass.async_add_executor_job(self.requeue, tuya_id, queued)
+            return False
+
+        if response is None:
+            # Rejected locally, or sent with an unknown outcome: never send these again
+            _LOGGER.warning("[%s] 🗑️ Dropped %s queued commands for %s (rejected or outcome unknown)",
+                            DOMAIN, len(commands), tuya_id)
+        elif response.status_code == 200 and response.json().get("success"):
+            _LOGGER.info("[%s] 📤 Replayed %s queued commands for %s", DOMAIN, len(commands), tuya_id)
+            status = self.data.get("status")
+            if status:
+                await status.async_dispatch_status(tuya_id, commands, commanded=True)
+        else:
+            _LOGGER.warning("[%s] ❌ Cloud rejected queued commands for %s: %s",
+                            DOMAIN, tuya_id, response.text)
+        return True
+
+    async def async_retry(self, _now=None):
+        """Periodic probe: try the oldest device first, then the rest if it got through."""
+        tuya_id = self.oldest_device()
+        if tuya_id is None or not await self.async_replay(tuya_id):
+            return
+        for other in list(self._queues):
+            await self.async_replay(other)
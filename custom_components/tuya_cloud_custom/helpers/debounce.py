@@ -0,0 +1,60 @@
+"""
+Tuya Cloud Custom: Last-value-wins command debouncer
+----------------------------------------------------
+Sliders and climate +/- buttons fire one call per step. The debouncer keeps
+only the newest value, sends it once the quiet window has passed, and runs
+sends one at a time so a DP never receives values out of order.
+"""
+
+import asyncio
+import logging
+
+from homeassistant.helpers.event import async_call_later
+
+from ..const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+class CommandDebouncer:
+    """Per-entity, per-DP debouncer around an async send callable."""
+
+    def __init__(self, hass, delay: float, send, name: str):
+        self._hass = hass
+        self._delay = delay
+        self._send = send
+        self._name = name
+
+        self._pending = _UNSET
+        self._unsub = None
+        self._lock = asyncio.Lock()
+
+    def async_schedule(self, value):
+        """Queue `value`, replacing anything not yet sent, and restart the window."""
+        if self._pending is not _UNSET:
+            _LOGGER.debug("[%s] ⏭️ %s: dropped superseded value %s", DOMAIN, self._name, self._pending)
+        self._pending = value
+
+        if self._unsub:
+            self._unsub()
+        self._unsub = async_call_later(self._hass, self._delay, self._async_fire)
+
+    async def _async_fire(self, _now):
+        self._unsub = None
+        # Lock keeps sends for this DP strictly ordered
+        async with self._lock:
+            if self._pending is _UNSET:
+                return
+            value = self._pending
+            self._pending = _UNSET
+            _LOGGER.debug("[%s] 📤 %s: sending debounced value %s", DOMAIN, self._name, value)
+            await self._send(value)
+
+    def async_cancel(self):
+        """Drop any pending value (entity removal)."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+        self._pending = _UNSET
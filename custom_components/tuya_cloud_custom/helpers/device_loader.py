@@ -4,18 +4,23 @@ Tuya Cloud Custom - Device Loader
 Loads all YAML files in config/devices/ and validates required structure.
 Confirms each device has a unique `tuya_device_id` and at least one entity.
 Supports multi-DP platforms like climate, plus switch, sensor, number.
+
+Each entity gets its sanitized id (`_base_id`) and default name (`_auto_name`)
+here, once; build_platform_index() then groups entities per platform so each
+platform setup only walks its own entries.
 """
 
 import os
-import yaml
 import logging
 
 from ..const import DOMAIN
+from .helper import sanitize
 
 _LOGGER = logging.getLogger(__name__)
 
 def load_tuya_devices(devices_dir: str) -> list:
     """Load all device YAMLs in the given directory."""
+    import yaml  # deferred: only needed in the executor
 
     devices = []
     seen_tuya_ids = set()  # ✅ new: track unique IDs
@@ -122,8 +127,45 @@ def load_tuya_devices(devices_dir: str) -> list:
         device_conf.setdefault("poll_interval", 60)
         device_conf["entities"] = entities
 
+        # ✅ Pre-sanitized ids / names (climate keys on unique_id, the rest on code)
+        for dp in entities:
+            key = "unique_id" if dp["platform"] == "climate" else "code"
+            dp["_base_id"] = sanitize(str(dp.get(key, "unknown")))
+            dp["_auto_name"] = dp["_base_id"].replace("_", " ").title()
+
         devices.append(device_conf)
         _LOGGER.info("[%s] ✅ Loaded %s with %s entities from %s",
                      DOMAIN, tuya_id, len(entities), file_name)
 
     return devices
+
+
+def build_platform_index(devices: list) -> dict:
+    """Group enabled entities of enabled devices by platform: {platform: [(device, dp), ...]}.
+
+    Mirrored sensors whose from_climate matches no enabled climate are dropped with a warning.
+    """
+    index = {}
+    for device in devices:
+        if not device.get("enabled", True):
+            continue
+        for dp in device.get("entities", []):
+            if dp.get("enabled", True):
+                index.setdefault(dp.get("platform"), []).append((device, dp))
+
+    # 🪞 A mirrored sensor needs an enabled climate on the same device, else it stays unknown forever
+    climates = {
+        (device["tuya_device_id"], dp.get("_base_id") or sanitize(str(dp.get("unique_id", "unknown"))))
+        for device, dp in index.get("climate", [])
+    }
+    sensors = []
+    for device, dp in index.get("sensor", []):
+        if dp.get("mirrored") and "from_climate" in dp:
+            if (device["tuya_device_id"], sanitize(str(dp["from_climate"]))) not in climates:
+                _LOGGER.warning("[%s] ⚠️ Mirrored sensor on %s skipped: from_climate '%s' is not an enabled "
+                                "climate unique_id of this device", DOMAIN, device["tuya_device_id"], dp["from_climate"])
+                continue
+        sensors.append((device, dp))
+    if "sensor" in index:
+        index["sensor"] = sensors
+    return index
@@ -1,4 +1,6 @@
 import appdaemon.plugins.hass.hassapi as hass
+import json
+import os
 import yaml
 
 class HAAddDevices(hass.Hass):
@@ -8,6 +10,11 @@ class HAAddDevices(hass.Hass):
         self.device_path = self.args.get("device_path", "/share/tuya_devices.yaml")
         self.log(f"📂 Config path set to: {self.device_path}")
 
+        # 📦 What was last published, so restarts only push the difference
+        self.cache_path = self.args.get("cache_path", os.path.splitext(self.device_path)[0] + "_published.json")
+        self.batch_size = int(self.args.get("batch_size", 50))
+        self.batch_delay = float(self.args.get("batch_delay", 1))
+
         self.load_and_process_devices()
 
     def load_and_process_devices(self):
@@ -20,7 +27,7 @@ class HAAddDevices(hass.Hass):
 
             if not devices:
                 self.log("⚠️ No devices found in the config file.")
-                return
+                return  # an empty or half-written file must not remove everything published
 
             self.process_devices(devices)
 
@@ -28,28 +35,52 @@ class HAAddDevices(hass.Hass):
             self.log(f"❌ Error loading device config: {e}", level="ERROR")
 
     def process_devices(self, devices):
+        desired = {}
         for device in devices:
             if not device.get("enabled", True):
-                self.log(f"🚫 Skipping disabled device: {device.get('ha_name')}")
+                self.log(f"🚫 Skipping disabled device: {device.get('ha_name')}", level="DEBUG")
                 continue
 
             ha_base = device.get("ha_name").replace("-", "_")  # HA does not line hyphens
 
             friendly_name = device.get("friendly_name", ha_base)
             dps = device.get("dps", [])
-            self.log(f"⚙️ Processing device: {friendly_name} with {len(dps)} DPs")
+            self.log(f"⚙️ Processing device: {friendly_name} with {len(dps)} DPs", level="DEBUG")
 
             for dp in dps:
                 if not dp.get("enabled", True):
-                    self.log(f"  🚫 Skipping disabled DP: {dp.get('code')}")
+                    self.log(f"  🚫 Skipping disabled DP: {dp.get('code')}", level="DEBUG")
                     continue
-                self.create_or_update_entity(device, dp, ha_base, friendly_name)
+                entity_id, attributes = self.build_entity(device, dp, ha_base, friendly_name)
+                desired[entity_id] = attributes
+
+        self.published = self.load_cache()
+
+        # 🔀 Diff against the last publish; also re-push anything HA no longer has (e.g. after an HA restart)
+        self.pending = [
+            (entity_id, attributes) for entity_id, attributes in desired.items()
+            if self.published.get(entity_id) != attributes or not self.entity_exists(entity_id)
+        ]
+        removed = [entity_id for entity_id in self.published if entity_id not in desired]
+        if not desired and removed:
+            self.log(f"⚠️ No enabled entities in {self.device_path}; keeping {len(removed)} published entities",
+                     level="WARNING")
+            removed = []
+
+        self.log(f"📊 {len(desired)} entities: {len(self.pending)} to publish, "
+                 f"{len(desired) - len(self.pending)} unchanged, {len(removed)} to remove")
+
+        for entity_id in removed:
+            self.remove_published(entity_id)
+        if removed:
+            self.save_cache()
 
+        self.publish_batch({})
 
-    def create_or_update_entity(self, device, dp, ha_base_raw, device_friendly_name):
+    def build_entity(self, device, dp, ha_base_raw, device_friendly_name):
         platform = dp.get("platform", "sensor")
         dp_code = dp["code"]
-        
+
         ha_base = ha_base_raw.replace("-", "_")  # Sanitize for valid entity_id
         entity_suffix = dp_code.lower().replace(" ", "_")
         entity_id = f"{platform}.{ha_base}_{entity_suffix}"
@@ -74,8 +105,53 @@ class HAAddDevices(hass.Hass):
         if dp.get("is_passive_entity", False):
             attributes["passive"] = True
 
+        return entity_id, attributes
+
+    def publish_batch(self, kwargs):
+        """Publish up to batch_size pending entities, then schedule the next batch."""
+        batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+        for entity_id, attributes in batch:
+            self.create_or_update_entity(entity_id, attributes)
+        if batch:
+            self.save_cache()
+
+        if self.pending:
+            self.run_in(self.publish_batch, self.batch_delay)
+        elif batch:
+            self.log(f"✅ Publish complete ({len(self.published)} entities published)")
+
+    def create_or_update_entity(self, entity_id, attributes):
         try:
             self.set_state(entity_id, state="unknown", attributes=attributes)
-            self.log(f"  ✅ Created/Updated {entity_id} with attributes: {attributes}")
+            self.published[entity_id] = attributes
+            self.log(f"  ✅ Created/Updated {entity_id}", level="DEBUG")
         except Exception as e:
             self.log(f"❌ Failed to set state for {entity_id}: {e}", level="ERROR")
+
+    def remove_published(self, entity_id):
+        try:
+            if self.entity_exists(entity_id):
+                self.remove_entity(entity_id)
+            self.published.pop(entity_id, None)
+            self.log(f"  🗑️ Removed {entity_id}", level="DEBUG")
+        except Exception as e:
+            self.log(f"❌ Failed to remove {entity_id}: {e}", level="ERROR")
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.log(f"⚠️ Ignoring unreadable publish cache {self.cache_path}: {e}", level="WARNING")
+            return {}
+
+    def save_cache(self):
+        try:
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.published, f, indent=2)
+            os.replace(tmp, self.cache_path)
+        except Exception as e:
+            self.log(f"❌ Failed to write publish cache {self.cache_path}: {e}", level="ERROR")
@@ -0,0 +1,39 @@
+"""
+Tuya Cloud Custom: Hedged status reads
+--------------------------------------
+Opt-in (`hedge_status_reads: true` in secrets.yaml). When a cloud status read
+is still running after the observed p95 of the status endpoint, Status sends
+one duplicate and uses whichever usable answer arrives first.
+
+Status reads are idempotent, so the only cost is quota. Every read earns
+HEDGE_MAX_RATIO of a hedge (at most HEDGE_BURST are saved up), so hedges
+never exceed that share of status reads, even while the cloud is slow.
+"""
+
+from ..const import HEDGE_MAX_RATIO, HEDGE_BURST
+
+
+class HedgeBudget:
+    """Token bucket for duplicate reads (event loop only)."""
+
+    def __init__(self, ratio: float = HEDGE_MAX_RATIO, burst: int = HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = float(burst)
+        self.reads = 0
+        self.hedged = 0
+        self.won = 0  # duplicates that answered first
+
+    def note_read(self):
+        self.reads += 1
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedged += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"reads": self.reads, "hedged": self.hedged, "won": self.won}
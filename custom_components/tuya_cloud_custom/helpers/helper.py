@@ -10,8 +10,7 @@ Description:
 
 import re
 import logging
-from ..const import DOMAIN, VALID_ENTITY_CATEGORIES, VALID_SENSOR_CLASSES
-from homeassistant.helpers.entity import EntityCategory
+from ..const import DOMAIN, VALID_ENTITY_CATEGORIES, VALID_SENSOR_CLASSES, SKIP_IF_UNCHANGED_MAX_AGE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,6 +27,43 @@ def sanitize(value: str) -> str:
     return re.sub(r"[^a-z0-9_]+", "_", value)
 
 
+def get_entry_data(hass, tuya_id: str) -> dict | None:
+    """Runtime data of the config entry (Tuya project) that owns a device."""
+    for data in hass.data.get(DOMAIN, {}).values():
+        if tuya_id in data["device_ids"]:
+            return data
+    return None
+
+
+def dp_values_equal(reported, sent) -> bool:
+    """Loose DP value compare: 5 == 5.0, True == 'true'."""
+    if isinstance(reported, (int, float)) and isinstance(sent, (int, float)):
+        return float(reported) == float(sent)
+    return str(reported).lower() == str(sent).lower()
+
+
+def skip_if_unchanged_age(dp: dict) -> float | None:
+    """`skip_if_unchanged: true` → default age, a number → that many seconds, else off."""
+    opt = dp.get("skip_if_unchanged", False)
+    if opt is True:
+        return SKIP_IF_UNCHANGED_MAX_AGE
+    if isinstance(opt, (int, float)) and opt > 0:
+        return float(opt)
+    return None
+
+
+def is_redundant_command(hass, tuya_id: str, dp_code: str, value, max_age: float | None) -> bool:
+    """True if an opted-in command would only re-send the DP's fresh, known value."""
+    if not max_age:
+        return False
+    data = get_entry_data(hass, tuya_id)
+    status = data.get("status") if data else None
+    if status and status.value_is_current(tuya_id, dp_code, value, max_age):
+        _LOGGER.debug("[%s] ⏭️ %s.%s already %s — command skipped", DOMAIN, tuya_id, dp_code, value)
+        return True
+    return False
+
+
 def build_entity_attrs(device: dict, dp: dict, platform: str) -> dict:
     """
     Build standard HA entity attributes for a given DP.
@@ -45,15 +81,15 @@ def build_entity_attrs(device: dict, dp: dict, platform: str) -> dict:
 
     tuya_id = device["tuya_device_id"]
 
-    if platform == "climate":
-        base_id = sanitize(dp.get("unique_id", "unknown"))
-    else:
-        base_id = sanitize(dp.get("code", "unknown"))
+    # ✅ The loader pre-computes these; fall back for entities built elsewhere
+    base_id = dp.get("_base_id")
+    if base_id is None:
+        base_id = sanitize(dp.get("unique_id" if platform == "climate" else "code", "unknown"))
 
     attrs["unique_id"] = f"{tuya_id}_{base_id}"
 
     # ✅ Clean pretty name: snake_case → Title Case
-    auto_name = base_id.replace("_", " ").title()
+    auto_name = dp.get("_auto_name") or base_id.replace("_", " ").title()
     attrs["name"] = dp.get("name") or auto_name
 
     # ✅ Icon support
@@ -79,6 +115,7 @@ def build_entity_attrs(device: dict, dp: dict, platform: str) -> dict:
 
         ec = dp.get("entity_category")
         if ec in VALID_ENTITY_CATEGORIES:
+            from homeassistant.helpers.entity import EntityCategory  # deferred: keeps helper.py importable headless
             attrs["entity_category"] = EntityCategory(ec)
         elif ec:
             _LOGGER.warning(
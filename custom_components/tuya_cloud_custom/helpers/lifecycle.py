@@ -0,0 +1,143 @@
+"""
+Tuya Cloud Custom: Config entry lifecycle
+-----------------------------------------
+Owns every timer, background task and closeable resource of one config entry,
+so unloading (or reloading) an entry leaves nothing running behind it.
+
+- Timers are started through track_interval() / call_later() and grouped by
+  kind ("poll", "token", "snapshot", ...) so they can be counted.
+- Timer callbacks run as tracked tasks; on shutdown in-flight work gets
+  LIFECYCLE_DRAIN_TIMEOUT seconds to finish, then whatever is left is cancelled.
+- Closers (worker, recorder, HTTP session, ...) run last, newest first.
+"""
+
+import asyncio
+import itertools
+import logging
+from datetime import timedelta
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from ..const import DOMAIN, LIFECYCLE_DRAIN_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """Timers, tasks and closers of one config entry."""
+
+    def __init__(self, hass, project: str):
+        self.hass = hass
+        self.project = project
+        self.closed = False
+        self._timers = {}  # kind → {timer id: unsubscribe}
+        self._tasks = set()
+        self._closers = []  # (name, close, in_executor)
+        self._ids = itertools.count()
+
+    # --------------------------------------------------------------------------
+    # Timers and tasks
+    # --------------------------------------------------------------------------
+    @callback
+    def track_interval(self, kind: str, action, seconds: float):
+        """Run the coroutine function action(now) every `seconds`; returns a cancel callable."""
+
+        @callback
+        def _tick(now):
+            self.create_task(action(now))
+
+        timer_id = next(self._ids)
+        return self._add_timer(kind, timer_id, lambda: async_track_time_interval(
+            self.hass, _tick, timedelta(seconds=seconds)))
+
+    @callback
+    def call_later(self, kind: str, delay: float, action):
+        """Run the coroutine function action(now) once after `delay`; returns a cancel callable."""
+
+        @callback
+        def _fire(now):
+            self._timers.get(kind, {}).pop(timer_id, None)
+            self.create_task(action(now))
+
+        timer_id = next(self._ids)
+        return self._add_timer(kind, timer_id, lambda: async_call_later(self.hass, delay, _fire))
+
+    @callback
+    def create_task(self, coro):
+        """Start a task that shutdown drains or cancels. Returns None once closed."""
+        if self.closed:
+            coro.close()
+            return None
+        task = self.hass.async_create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _add_timer(self, kind: str, timer_id: int, schedule):
+        if self.closed:
+            return lambda: None
+        timers = self._timers.setdefault(kind, {})
+        timers[timer_id] = schedule()
+
+        @callback
+        def _cancel():
+            unsub = timers.pop(timer_id, None)
+            if unsub:
+                unsub()
+
+        return _cancel
+
+    def add_closer(self, name: str, close, in_executor: bool = False):
+        """Run close() at shutdown: a coroutine function, a callback, or blocking (in_executor)."""
+        self._closers.append((name, close, in_executor))
+
+    # --------------------------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------------------------
+    def count(self, kind: str) -> int:
+        return len(self._timers.get(kind, {}))
+
+    def report(self) -> dict:
+        """Active timers per kind plus running tasks, e.g. {"poll": 40, "token": 1, "tasks": 2}."""
+        report = {kind: len(timers) for kind, timers in self._timers.items() if timers}
+        report["tasks"] = len(self._tasks)
+        return report
+
+    # --------------------------------------------------------------------------
+    # Shutdown
+    # --------------------------------------------------------------------------
+    async def async_shutdown(self):
+        """Cancel all timers, drain or cancel running tasks, then run the closers."""
+        if self.closed:
+            return
+        self.closed = True
+        _LOGGER.info("[%s] 🧹 [%s] Shutting down: %s", DOMAIN, self.project, self.report())
+
+        for timers in self._timers.values():
+            for unsub in timers.values():
+                unsub()
+            timers.clear()
+
+        current = asyncio.current_task()
+        tasks = [t for t in self._tasks if t is not current]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=LIFECYCLE_DRAIN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                _LOGGER.warning("[%s] 🧹 [%s] Cancelled %s tasks still running after %ss",
+                                DOMAIN, self.project, len(pending), LIFECYCLE_DRAIN_TIMEOUT)
+
+        while self._closers:
+            name, close, in_executor = self._closers.pop()
+            try:
+                if in_executor:
+                    await self.hass.async_add_executor_job(close)
+                else:
+                    result = close()
+                    if asyncio.iscoroutine(result):
+                        await result
+            except Exception as e:
+                _LOGGER.warning("[%s] ⚠️ [%s] Failed to close %s: %s", DOMAIN, self.project, name, e)
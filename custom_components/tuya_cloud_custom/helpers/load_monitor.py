@@ -0,0 +1,91 @@
+"""
+Tuya Cloud Custom: Event loop load monitor
+------------------------------------------
+Measures event loop lag (how late a 1 s probe timer fires) and the depth of
+the default executor's queue. While either is over its threshold, routine
+background work (scheduled polls, online checks, queue retries) is thinned
+out: a device's poll is skipped at most LOAD_MAX_SKIPS times in a row, so
+nothing goes stale indefinitely. User commands never consult this.
+"""
+
+import logging
+
+from homeassistant.core import callback
+
+from ..const import (
+    DOMAIN,
+    LOAD_PROBE_INTERVAL,
+    LOAD_LAG_THRESHOLD,
+    LOAD_EXECUTOR_THRESHOLD,
+    LOAD_MAX_SKIPS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LoadMonitor:
+    """Loop lag / executor depth probe with per-device skip accounting."""
+
+    def __init__(self, hass):
+        self.hass = hass
+        self.lag = 0.0
+        self.shed = 0  # polls skipped so far
+        self._expected = 0.0
+        self._handle = None
+        self._skips = {}  # tuya_id → consecutive skips
+        self._was_overloaded = False
+
+    @callback
+    def start(self):
+        if self._handle is None:
+            self._schedule()
+
+    @callback
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self):
+        self._expected = self.hass.loop.time() + LOAD_PROBE_INTERVAL
+        self._handle = self.hass.loop.call_at(self._expected, self._probe)
+
+    @callback
+    def _probe(self):
+        lag = max(0.0, self.hass.loop.time() - self._expected)
+        # Rise immediately, decay over a few probes
+        self.lag = lag if lag > self.lag else (self.lag + lag) / 2
+        self._schedule()
+
+    @property
+    def executor_depth(self) -> int:
+        executor = getattr(self.hass.loop, "_default_executor", None)
+        queue = getattr(executor, "_work_queue", None)
+        return queue.qsize() if queue is not None else 0
+
+    def overloaded(self) -> bool:
+        """True while HA is struggling; logs transitions."""
+        depth = self.executor_depth
+        overloaded = self.lag > LOAD_LAG_THRESHOLD or depth > LOAD_EXECUTOR_THRESHOLD
+        if overloaded != self._was_overloaded:
+            self._was_overloaded = overloaded
+            if overloaded:
+                _LOGGER.warning("[%s] 🐢 HA is busy (loop lag %.2fs, executor queue %s) — thinning out background polls",
+                                DOMAIN, self.lag, depth)
+            else:
+                _LOGGER.info("[%s] 🐇 HA load back to normal — %s polls skipped so far", DOMAIN, self.shed)
+        return overloaded
+
+    def should_skip_poll(self, tuya_id: str) -> bool:
+        """Skip this routine poll? Never more than LOAD_MAX_SKIPS in a row per device."""
+        if not self.overloaded():
+            self._skips.pop(tuya_id, None)
+            return False
+        skips = self._skips.get(tuya_id, 0) + 1
+        if skips > LOAD_MAX_SKIPS:
+            self._skips[tuya_id] = 0
+            return False
+        self._skips[tuya_id] = skips
+        self.shed += 1
+        _LOGGER.debug("[%s] 🐢 Poll of %s skipped (%s/%s)", DOMAIN, tuya_id, skips, LOAD_MAX_SKIPS)
+        return True
@@ -0,0 +1,289 @@
+"""
+Tuya Cloud Custom: Local LAN transport
+--------------------------------------
+Optional direct control of devices on the LAN using the Tuya LAN protocol
+(3.3 and 3.4, TCP 6668). Enabled per device with `local: true` plus
+`local_ip`, `local_key` and `version`; DPs are addressed by each entity's `dp` id.
+
+Every local read / command falls back to the cloud path on failure, and a
+failing device stays on the cloud for LOCAL_RETRY_AFTER seconds.
+
+Frame layout (both versions):
+  000055AA | seq | cmd | length | [retcode] payload | crc32 (3.3) / hmac-sha256 (3.4) | 0000AA99
+
+pack_message / unpack_message / encrypt / decrypt work for either side of
+the connection, so a fake device server can be built from them.
+"""
+
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+
+from ..const import DOMAIN, LOCAL_PORT, LOCAL_TIMEOUT, LOCAL_RETRY_AFTER
+
+_LOGGER = logging.getLogger(__name__)
+
+PREFIX = 0x000055AA
+SUFFIX = 0x0000AA99
+HEADER = struct.Struct(">4I")
+
+# Command ids
+SESS_KEY_NEG_START = 3
+SESS_KEY_NEG_RESP = 4
+SESS_KEY_NEG_FINISH = 5
+CONTROL = 7
+STATUS = 8
+DP_QUERY = 10
+CONTROL_NEW = 13
+DP_QUERY_NEW = 16
+
+# Commands sent without the "3.x" + 12 zero bytes version header
+NO_VERSION_HEADER = {DP_QUERY, DP_QUERY_NEW, SESS_KEY_NEG_START, SESS_KEY_NEG_RESP, SESS_KEY_NEG_FINISH}
+
+SUPPORTED_VERSIONS = {"3.3", "3.4"}
+
+
+class LocalProtocolError(Exception):
+    """Malformed, unauthenticated or rejected LAN frame."""
+
+
+# ------------------------------------------------------------------------------
+# Crypto / framing
+# ------------------------------------------------------------------------------
+def _aes(key: bytes):
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    return Cipher(algorithms.AES(key), modes.ECB())
+
+
+def encrypt(key: bytes, data: bytes, pad: bool = True) -> bytes:
+    if pad:
+        n = 16 - len(data) % 16
+        data += bytes([n]) * n
+    encryptor = _aes(key).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def decrypt(key: bytes, data: bytes) -> bytes:
+    decryptor = _aes(key).decryptor()
+    raw = decryptor.update(data) + decryptor.finalize()
+    n = raw[-1] if raw else 0
+    if not 1 <= n <= 16:
+        raise LocalProtocolError("bad padding")
+    return raw[:-n]
+
+
+def version_header(version: str) -> bytes:
+    return version.encode() + b"\0" * 12
+
+
+def pack_message(seq: int, cmd: int, payload: bytes, key: bytes, version: str, retcode: int | None = None) -> bytes:
+    """Frame an (already encrypted) payload."""
+    body = (struct.pack(">I", retcode) if retcode is not None else b"") + payload
+    if version == "3.4":
+        header = HEADER.pack(PREFIX, seq, cmd, len(body) + 36)
+        check = hmac.new(key, header + body, hashlib.sha256).digest()
+    else:
+        header = HEADER.pack(PREFIX, seq, cmd, len(body) + 8)
+        check = struct.pack(">I", binascii.crc32(header + body) & 0xFFFFFFFF)
+    return header + body + check + struct.pack(">I", SUFFIX)
+
+
+def unpack_message(frame: bytes, key: bytes, version: str) -> tuple:
+    """Verify a frame and return (seq, cmd, retcode, payload). retcode is None when absent."""
+    prefix, seq, cmd, length = HEADER.unpack_from(frame)
+    if prefix != PREFIX or len(frame) != HEADER.size + length:
+        raise LocalProtocolError("bad frame header")
+
+    trailer = 36 if version == "3.4" else 8
+    signed = frame[:-trailer]
+    check = frame[-trailer:-4]
+    if version == "3.4":
+        expected = hmac.new(key, signed, hashlib.sha256).digest()
+    else:
+        expected = struct.pack(">I", binascii.crc32(signed) & 0xFFFFFFFF)
+    if not hmac.compare_digest(check, expected):
+        raise LocalProtocolError("frame check failed (wrong local_key?)")
+
+    body = signed[HEADER.size:]
+    retcode = None
+    # Device → client frames start with a 4-byte return code; encrypted data never has 3 leading zero bytes
+    if len(body) >= 4 and not struct.unpack(">I", body[:4])[0] & 0xFFFFFF00:
+        retcode, body = struct.unpack(">I", body[:4])[0], body[4:]
+    return seq, cmd, retcode, body
+
+
+def _recv_frame(sock) -> bytes:
+    header = _recv_exact(sock, HEADER.size)
+    length = HEADER.unpack(header)[3]
+    if length > 0x10000:
+        raise LocalProtocolError("frame too large")
+    return header + _recv_exact(sock, length)
+
+
+def _recv_exact(sock, n: int) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed by device")
+        buf += chunk
+    return buf
+
+
+# ------------------------------------------------------------------------------
+# Device client
+# ------------------------------------------------------------------------------
+class LocalDevice:
+    """One device reachable over the LAN. Blocking — call from the executor."""
+
+    def __init__(self, device_id: str, ip: str, local_key: str, version: str, dp_ids: dict,
+                 port: int = LOCAL_PORT, timeout: float = LOCAL_TIMEOUT):
+        self.device_id = device_id
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.version = version
+        self.local_key = local_key.encode("latin1")
+        self.dp_ids = dp_ids                                  # code → dp id
+        self.codes = {dp: code for code, dp in dp_ids.items()}  # dp id → code
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._cloud_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._cloud_until
+
+    def status(self) -> list | None:
+        """Read all mapped DPs as [{"code", "value"}], or None to fall back to the cloud."""
+        if not self.available:
+            return None
+        if self.version == "3.4":
+            cmd, payload = DP_QUERY_NEW, {}
+        else:
+            cmd, payload = DP_QUERY, {"gwId": self.device_id, "devId": self.device_id,
+                                      "uid": self.device_id, "t": str(int(time.time()))}
+
+        reply = self._request(cmd, payload, expect={DP_QUERY, DP_QUERY_NEW, STATUS})
+        if reply is None:
+            return None
+        dps = reply.get("dps") or reply.get("data", {}).get("dps") or {}
+        values = [{"code": self.codes[dp], "value": value} for dp, value in dps.items() if dp in self.codes]
+        if not values:
+            # An answer without any mapped DP is not a status — let the cloud read it
+            self._cloud_until = time.monotonic() + LOCAL_RETRY_AFTER
+            _LOGGER.warning("[%s] ⚠️ Local status of %s (%s) had no known DPs, using the cloud for %ss",
+                            DOMAIN, self.device_id, self.ip, LOCAL_RETRY_AFTER)
+            return None
+        return values
+
+    def send_commands(self, commands: list) -> bool:
+        """Send [{"code", "value"}] locally. False means use the cloud instead."""
+        if not self.available:
+            return False
+        try:
+            dps = {str(self.dp_ids[cmd["code"]]): cmd["value"] for cmd in commands}
+        except KeyError:
+            return False  # a DP without a `dp` id — only the cloud knows it
+
+        if self.version == "3.4":
+            cmd, payload = CONTROL_NEW, {"protocol": 5, "t": int(time.time()), "data": {"dps": dps}}
+        else:
+            cmd, payload = CONTROL, {"devId": self.device_id, "uid": self.device_id,
+                                     "t": str(int(time.time())), "dps": dps}
+        return self._request(cmd, payload, expect={cmd}) is not None
+
+    # --------------------------------------------------------------------------
+    def _request(self, cmd: int, payload: dict, expect: set) -> dict | None:
+        started = time.monotonic()
+        try:
+            with self._lock, socket.create_connection((self.ip, self.port), timeout=self.timeout) as sock:
+                key = self._negotiate(sock) if self.version == "3.4" else self.local_key
+                self._send(sock, cmd, json.dumps(payload, separators=(",", ":")).encode(), key)
+                while True:
+                    _, reply_cmd, retcode, body = unpack_message(_recv_frame(sock), key, self.version)
+                    if reply_cmd not in expect:
+                        continue  # e.g. an unsolicited status push
+                    if retcode:
+                        raise LocalProtocolError(f"device returned code {retcode}")
+                    result = self._decode(body, key)
+                    _LOGGER.debug("[%s] 🏠 Local %s cmd %s answered in %.0f ms",
+                                  DOMAIN, self.device_id, cmd, (time.monotonic() - started) * 1000)
+                    return result
+        except (OSError, ValueError, LocalProtocolError) as e:
+            self._cloud_until = time.monotonic() + LOCAL_RETRY_AFTER
+            _LOGGER.warning("[%s] ⚠️ Local control of %s (%s) failed, using the cloud for %ss: %s",
+                            DOMAIN, self.device_id, self.ip, LOCAL_RETRY_AFTER, e)
+            return None
+
+    def _send(self, sock, cmd: int, raw: bytes, key: bytes):
+        self._seq += 1
+        if self.version == "3.4":
+            if cmd not in NO_VERSION_HEADER:
+                raw = version_header(self.version) + raw
+            payload = encrypt(key, raw)
+        else:
+            payload = encrypt(key, raw)
+            if cmd not in NO_VERSION_HEADER:
+                payload = version_header(self.version) + payload
+        sock.sendall(pack_message(self._seq, cmd, payload, key, self.version))
+
+    def _decode(self, body: bytes, key: bytes) -> dict:
+        if not body:
+            return {}
+        if self.version == "3.3" and body.startswith(b"3.3"):
+            body = body[15:]
+        raw = decrypt(key, body)
+        if raw.startswith(self.version.encode()):
+            raw = raw[15:]
+        return json.loads(raw) if raw.strip() else {}
+
+    def _negotiate(self, sock) -> bytes:
+        """3.4 session key exchange; returns the session key."""
+        local_nonce = os.urandom(16)
+        self._send(sock, SESS_KEY_NEG_START, local_nonce, self.local_key)
+
+        _, cmd, _, body = unpack_message(_recv_frame(sock), self.local_key, self.version)
+        if cmd != SESS_KEY_NEG_RESP:
+            raise LocalProtocolError(f"unexpected negotiation reply {cmd}")
+        raw = decrypt(self.local_key, body)
+        remote_nonce, proof = raw[:16], raw[16:48]
+        if not hmac.compare_digest(proof, hmac.new(self.local_key, local_nonce, hashlib.sha256).digest()):
+            raise LocalProtocolError("session negotiation failed (wrong local_key?)")
+
+        self._send(sock, SESS_KEY_NEG_FINISH,
+                   hmac.new(self.local_key, remote_nonce, hashlib.sha256).digest(), self.local_key)
+        mixed = bytes(a ^ b for a, b in zip(local_nonce, remote_nonce))
+        return encrypt(self.local_key, mixed, pad=False)
+
+
+def build_local_devices(devices: list) -> dict:
+    """Create a LocalDevice for every enabled device with `local: true`. Returns {tuya_id: LocalDevice}."""
+    local = {}
+    for device in devices:
+        if not device.get("local") or not device.get("enabled", True):
+            continue
+        tuya_id = device["tuya_device_id"]
+        version = str(device.get("version", "3.3"))
+        if not device.get("local_ip") or not device.get("local_key") or version not in SUPPORTED_VERSIONS:
+            _LOGGER.warning("[%s] ⚠️ %s: local control needs local_ip, local_key and version 3.3/3.4 — using the cloud",
+                            DOMAIN, tuya_id)
+            continue
+
+        dp_ids = {}
+        for dp in device.get("entities", []):
+            for block in [dp] + [v for v in dp.values() if isinstance(v, dict)]:
+                if block.get("code") and block.get("dp") is not None:
+                    dp_ids[block["code"]] = str(block["dp"])
+
+        local[tuya_id] = LocalDevice(tuya_id, device["local_ip"], str(device["local_key"]), version, dp_ids)
+    if local:
+        _LOGGER.info("[%s] 🏠 Local LAN control enabled for %s devices", DOMAIN, len(local))
+    return local
@@ -0,0 +1,83 @@
+"""
+Tuya Cloud Custom: Optimistic command helper
+--------------------------------------------
+Used by switch, number and select when the DP sets `optimistic: true`.
+
+- The entity shows the new state immediately.
+- The command is sent in the background.
+- The state rolls back if the cloud rejects the command.
+- A confirmation read follows; if the device disagrees, the polled value wins.
+"""
+
+import asyncio
+import logging
+
+from ..const import DOMAIN, OPTIMISTIC_CONFIRM_DELAY
+from .tuya_command import send_tuya_command
+from .helper import dp_values_equal
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_send_optimistic(entity, value, new_state):
+    """Write new_state now, send `value` without waiting for the cloud."""
+    previous = entity._state
+    entity._state = new_state
+    entity.async_write_ha_state()
+    entity._data["lifecycle"].create_task(_async_commit(entity, value, new_state, previous))
+
+
+async def _async_commit(entity, value, new_state, previous):
+    """Send the command, then roll back or confirm."""
+    hass = entity._hass
+    device = entity._device
+    dp_code = entity._dp["code"]
+
+    response = await hass.async_add_executor_job(
+        send_tuya_command, hass, device["tuya_device_id"], dp_code, value
+    )
+
+    if getattr(response, "queued", False):
+        # Offline: the command goes out from the queue later — keep the new state
+        _LOGGER.info("[%s] 📥 %s kept at %s; command queued until the cloud is reachable",
+                     DOMAIN, entity._attr_unique_id, new_state)
+        return
+
+    reason = _rejection_reason(response)
+    if reason:
+        if entity._state == new_state:
+            entity._state = previous
+            entity.async_write_ha_state()
+        _LOGGER.warning("[%s] ↩️ Rolled back %s to %s: %s",
+                        DOMAIN, entity._attr_unique_id, previous, reason)
+        return
+
+    # 🔍 Confirmation read — dispatch updates the entity with whatever the device reports
+    status = entity._data.get("status")
+    if status is None:
+        return
+    await asyncio.sleep(OPTIMISTIC_CONFIRM_DELAY)
+    payload = await status.async_fetch_status(device)
+    if payload is None:
+        return
+
+    reported = next((dp["value"] for dp in payload if dp["code"] == dp_code), None)
+    if reported is not None and not dp_values_equal(reported, value):
+        _LOGGER.warning("[%s] ↩️ Rolled back %s: sent %s but device reports %s",
+                        DOMAIN, entity._attr_unique_id, value, reported)
+
+
+def _rejection_reason(response):
+    """Return why a command failed, or None if the cloud accepted it."""
+    if response is None:
+        return "no response from Tuya cloud"
+    if response.status_code != 200:
+        return f"HTTP {response.status_code}"
+    try:
+        body = response.json()
+    except ValueError:
+        return "invalid JSON response"
+    if not body.get("success"):
+        return f"cloud rejected command: {body.get('code')} {body.get('msg')}"
+    return None
+
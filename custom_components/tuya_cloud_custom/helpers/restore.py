@@ -0,0 +1,90 @@
+"""
+Tuya Cloud Custom: Coordinated restore_on_reconnect
+---------------------------------------------------
+Entities no longer send their own restore command from async_added_to_hass.
+They hand the value to the coordinator, which, once Status is running:
+
+1. uses each device's warm-up status (or reads it once),
+2. drops DPs whose polled value already matches,
+3. sends the rest as one multi-DP command per device,
+4. waits RESTORE_STAGGER seconds before the next device.
+"""
+
+import asyncio
+import logging
+
+from ..const import DOMAIN, RESTORE_STAGGER
+from .tuya_command import send_tuya_commands
+from .helper import dp_values_equal
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RestoreCoordinator:
+    """Collects restore requests per device and flushes them after startup."""
+
+    def __init__(self, hass, data: dict):
+        self.hass = hass
+        self.data = data  # config entry runtime data
+        self._pending = {}  # tuya_id → {code: (value, on_restored)}
+        self._started = False
+
+    def async_request(self, entity, value, on_restored):
+        """Queue a restore of `value` for the entity's DP; on_restored() runs once it is in place."""
+        tuya_id = entity._device["tuya_device_id"]
+        self._pending.setdefault(tuya_id, {})[entity._dp["code"]] = (value, on_restored)
+
+        # Entities added after startup (e.g. re-enabled) are flushed on their own
+        if self._started:
+            self.data["lifecycle"].create_task(self._async_restore_device(tuya_id))
+
+    async def async_start(self):
+        """Flush all collected restores, one device at a time."""
+        self._started = True
+        device_ids = list(self._pending)
+        if not device_ids:
+            return
+
+        _LOGGER.info("[%s] 🔁 Restoring %s DPs across %s devices",
+                     DOMAIN, sum(len(v) for v in self._pending.values()), len(device_ids))
+
+        for i, tuya_id in enumerate(device_ids):
+            if i:
+                await asyncio.sleep(RESTORE_STAGGER)
+            await self._async_restore_device(tuya_id)
+
+    async def _async_restore_device(self, tuya_id):
+        pending = self._pending.pop(tuya_id, None)
+        if not pending:
+            return
+
+        device = next((d for d in self.data["devices"] if d["tuya_device_id"] == tuya_id), None)
+        status = self.data.get("status")
+        current = {}
+        if status:
+            # Warm-up has normally polled the device already; fetch only if not
+            current = {code: v for (tid, code), (v, _) in status.last_values.items() if tid == tuya_id}
+            if not current and device:
+                payload = await status.async_fetch_status(device)
+                current = {dp["code"]: dp["value"] for dp in payload or []}
+
+        commands = []
+        for code, (value, on_restored) in pending.items():
+            if code in current and dp_values_equal(current[code], value):
+                _LOGGER.debug("[%s] ⏭️ %s.%s already %s — restore skipped", DOMAIN, tuya_id, code, value)
+                on_restored()
+            else:
+                commands.append({"code": code, "value": value})
+
+        if not commands:
+            return
+
+        response = await self.hass.async_add_executor_job(send_tuya_commands, self.hass, tuya_id, commands)
+        if response and response.status_code == 200 and response.json().get("success"):
+            _LOGGER.info("[%s] ♻️ Restored %s on %s", DOMAIN, commands, tuya_id)
+            for cmd in commands:
+                pending[cmd["code"]][1]()
+        else:
+            _LOGGER.warning("[%s] ❌ Restore failed for %s: %s",
+                            DOMAIN, tuya_id, response.text if response else "No response")
+
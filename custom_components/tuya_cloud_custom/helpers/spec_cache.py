@@ -0,0 +1,200 @@
+"""
+Tuya Cloud Custom: Device specification cache
+---------------------------------------------
+Fetches each product's DP specification once per `tuya_product_id`
+(GET /v1.0/devices/{id}/specifications), caches it in config/specs/, and uses it to:
+
+- fill in `type`, number bounds/step, select options and climate `scale` left out of the YAML,
+- warn about YAML values that disagree with the product,
+- reject out-of-range or read-only commands before any network call.
+"""
+
+import json
+import logging
+import os
+
+from ..const import DOMAIN
+from .helper import sanitize
+
+_LOGGER = logging.getLogger(__name__)
+
+# Tuya spec type → YAML `type`
+TYPE_MAP = {
+    "Boolean": "boolean",
+    "Integer": "integer",
+    "Enum": "enum",
+    "Bitmap": "bitfield",
+    "String": "string",
+    "Json": "string",
+    "Raw": "string",
+}
+
+
+# ------------------------------------------------------------------------------
+# Load / fetch (executor only)
+# ------------------------------------------------------------------------------
+def load_specs(devices: list, client, specs_dir: str, fetch: bool = True) -> dict:
+    """Return {product_id: {code: spec}}, fetching only products not cached yet (fetch=False: cache only)."""
+    specs = {}
+    try:
+        os.makedirs(specs_dir, exist_ok=True)
+    except OSError as e:
+        _LOGGER.warning("[%s] ⚠️ Cannot create spec cache folder %s: %s", DOMAIN, specs_dir, e)
+
+    for device in devices:
+        product_id = device.get("tuya_product_id")
+        if not product_id or product_id in specs:
+            continue
+
+        path = os.path.join(specs_dir, f"{sanitize(product_id)}.json")
+        raw = None
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as f:
+                    raw = json.load(f)
+            except Exception as e:
+                _LOGGER.warning("[%s] ⚠️ Ignoring unreadable spec cache %s: %s", DOMAIN, path, e)
+
+        if raw is None:
+            if not fetch:
+                continue
+            raw = _fetch_spec(client, device["tuya_device_id"])
+            if raw is None:
+                continue
+            _write_cache(path, raw, product_id)
+
+        specs[product_id] = _parse(raw)
+
+    return specs
+
+
+def _write_cache(path: str, raw: dict, product_id: str):
+    """Atomic cache write; a failure only costs a re-fetch next start."""
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(raw, f, indent=2)
+        os.replace(tmp, path)
+        _LOGGER.info("[%s] 📘 Cached specification for product %s", DOMAIN, product_id)
+    except OSError as e:
+        _LOGGER.warning("[%s] ⚠️ Could not cache specification for product %s: %s", DOMAIN, product_id, e)
+
+
+def _fetch_spec(client, tuya_id: str):
+    try:
+        return client.get_result(f"/v1.0/devices/{tuya_id}/specifications", kind="spec", device=tuya_id)
+    except Exception as e:
+        _LOGGER.warning("[%s] ⚠️ Could not fetch specification for %s: %s", DOMAIN, tuya_id, e)
+        return None
+
+
+def _parse(raw: dict) -> dict:
+    """Flatten Tuya's status/functions lists into {code: spec}."""
+    parsed = {}
+    for section, writable in (("status", False), ("functions", True)):
+        for item in raw.get(section, []):
+            values = item.get("values") or "{}"
+            if isinstance(values, str):
+                try:
+                    values = json.loads(values)
+                except ValueError:
+                    values = {}
+
+            entry = parsed.setdefault(item["code"], {"writable": False})
+            entry["type"] = TYPE_MAP.get(item.get("type"), "string")
+            entry["writable"] = entry["writable"] or writable
+            for key in ("min", "max", "step", "scale", "unit"):
+                if key in values:
+                    entry[key] = values[key]
+            if "range" in values:
+                entry["range"] = [str(v) for v in values["range"]]
+    return parsed
+
+
+# ------------------------------------------------------------------------------
+# Apply at load time
+# ------------------------------------------------------------------------------
+def apply_specs(devices: list, specs: dict) -> dict:
+    """Fill in / check entity definitions. Returns {tuya_id: {code: spec}} for command checks."""
+    by_device = {}
+    for device in devices:
+        spec = specs.get(device.get("tuya_product_id"))
+        if not spec:
+            continue
+        tuya_id = device["tuya_device_id"]
+        by_device[tuya_id] = spec
+
+        for dp in device.get("entities", []):
+            if dp.get("mirrored"):
+                continue
+            if dp.get("platform") == "climate":
+                _apply_climate(tuya_id, dp, spec)
+                continue
+
+            entry = spec.get(dp.get("code"))
+            if entry is None:
+                _LOGGER.warning("[%s] ⚠️ %s: DP code '%s' is not in the product specification",
+                                DOMAIN, tuya_id, dp.get("code"))
+                continue
+
+            dp.setdefault("type", entry["type"])
+
+            if dp.get("platform") == "number" and entry["type"] == "integer":
+                dp.setdefault("min_value", entry.get("min", 0))
+                dp.setdefault("max_value", entry.get("max", 100))
+                dp.setdefault("step_size", entry.get("step", 1))
+                if "min" in entry and dp["min_value"] < entry["min"] or "max" in entry and dp["max_value"] > entry["max"]:
+                    _LOGGER.warning("[%s] ⚠️ %s.%s: YAML range %s–%s is wider than the device's %s–%s",
+                                    DOMAIN, tuya_id, dp["code"], dp["min_value"], dp["max_value"],
+                                    entry.get("min"), entry.get("max"))
+
+            if dp.get("platform") == "select" and "range" in entry:
+                if not dp.get("options"):
+                    dp["options"] = {key: key for key in entry["range"]}
+                unknown = [k for k in dp["options"] if str(k) not in entry["range"]]
+                if unknown:
+                    _LOGGER.warning("[%s] ⚠️ %s.%s: options %s are not valid for this device (%s)",
+                                    DOMAIN, tuya_id, dp["code"], unknown, entry["range"])
+    return by_device
+
+
+def _apply_climate(tuya_id: str, dp: dict, spec: dict):
+    for part in ("current_temperature", "target_temperature", "on_off", "hvac_mode"):
+        block = dp.get(part)
+        if not isinstance(block, dict) or block.get("code") not in spec:
+            continue
+        block.setdefault("type", spec[block["code"]]["type"])
+
+    target = dp.get("target_temperature") or {}
+    entry = spec.get(target.get("code"))
+    if entry and "scale" in entry:
+        spec_scale = 10 ** int(entry["scale"])
+        if "scale" not in dp:
+            dp["scale"] = spec_scale
+        elif int(dp["scale"]) != spec_scale:
+            _LOGGER.warning("[%s] ⚠️ %s climate '%s': scale %s but the device reports scale %s",
+                            DOMAIN, tuya_id, dp.get("unique_id"), dp["scale"], spec_scale)
+
+
+# ------------------------------------------------------------------------------
+# Command check
+# ------------------------------------------------------------------------------
+def validate_command(spec: dict, code: str, value) -> str | None:
+    """Return why a command is invalid for this device, or None if it looks fine."""
+    entry = spec.get(code)
+    if entry is None:
+        return None  # not described — let the cloud decide
+    if not entry["writable"]:
+        return "DP is read-only"
+
+    if entry["type"] == "integer":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return f"expected a number, got {value!r}"
+        if "min" in entry and value < entry["min"] or "max" in entry and value > entry["max"]:
+            return f"{value} outside {entry.get('min')}–{entry.get('max')}"
+    elif entry["type"] == "enum" and "range" in entry:
+        if str(value) not in entry["range"]:
+            return f"{value!r} not one of {entry['range']}"
+    elif entry["type"] == "boolean" and not isinstance(value, bool):
+        return f"expected true/false, got {value!r}"
+    return None
@@ -5,25 +5,25 @@ Handles requesting or refreshing the Tuya Cloud access token.
 """
 
 import json
-import time
-import uuid
-import yaml
-import hmac
-import hashlib
 import logging
-import requests  # only runs in executor
 
 from ..const import DOMAIN
+from .cloud_client import TuyaCloudClient
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def refresh_token(secrets_file, token_file):
-    """Refresh or request a new Tuya Cloud API token."""
+def refresh_token(secrets_file, token_file) -> bool:
+    """Refresh or request a new Tuya Cloud API token. Returns True once a token is saved."""
+    import yaml  # deferred: only needed in the executor
 
     try:
-        with open(secrets_file, "r") as f:
-            secrets = yaml.safe_load(f)
+        try:
+            with open(secrets_file, "r") as f:
+                secrets = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            _LOGGER.error(f"[{DOMAIN}] ❌ Missing {secrets_file}")
+            return False
 
         client_id = secrets.get("client_id")
         client_secret = secrets.get("client_secret")
@@ -31,7 +31,7 @@ def refresh_token(secrets_file, token_file):
 
         if not client_id or not client_secret or not base_url:
             _LOGGER.error(f"[{DOMAIN}] ❌ secrets.yaml missing fields.")
-            return
+            return False
 
         try:
             with open(token_file, "r") as f:
@@ -41,48 +41,29 @@ def refresh_token(secrets_file, token_file):
             _LOGGER.warning(f"[{DOMAIN}] 📂 No token file yet — will request new token.")
             refresh_token_val = None
 
-        if refresh_token_val:
-            _LOGGER.info(f"[{DOMAIN}] 🔄 Trying to refresh using refresh_token...")
-            success = _refresh_existing(client_id, client_secret, base_url, refresh_token_val, token_file)
-            if success:
-                return
-            _LOGGER.warning(f"[{DOMAIN}] ⚠️ Refresh failed — requesting NEW token instead.")
-
-        _LOGGER.info(f"[{DOMAIN}] 🔑 Requesting NEW token...")
-        _request_new(client_id, client_secret, base_url, token_file)
+        client = TuyaCloudClient(client_id, client_secret, base_url, token_file)
+        try:
+            if refresh_token_val:
+                _LOGGER.info(f"[{DOMAIN}] 🔄 Trying to refresh using refresh_token...")
+                success = _refresh_existing(client, refresh_token_val, token_file)
+                if success:
+                    return True
+                _LOGGER.warning(f"[{DOMAIN}] ⚠️ Refresh failed — requesting NEW token instead.")
+
+            _LOGGER.info(f"[{DOMAIN}] 🔑 Requesting NEW token...")
+            return _request_new(client, token_file)
+        finally:
+            client.close()
 
     except Exception as e:
         _LOGGER.exception(f"[{DOMAIN}] 💥 Exception in refresh_token: {e}")
+        return False
 
 
-def _refresh_existing(client_id, client_secret, base_url, refresh_token_val, token_file):
+def _refresh_existing(client, refresh_token_val, token_file):
     """Refresh an existing token using the refresh_token."""
-    url_path = f"/v1.0/token/{refresh_token_val}"
-    method = "GET"
-
-    t = str(int(time.time() * 1000))
-    nonce = str(uuid.uuid4())
-    content_hash = hashlib.sha256("".encode()).hexdigest()
-    string_to_sign = f"{method}\n{content_hash}\n\n{url_path}"
-    sign_str = f"{client_id}{t}{nonce}{string_to_sign}"
-
-    signature = hmac.new(
-        client_secret.encode(),
-        sign_str.encode(),
-        hashlib.sha256
-    ).hexdigest().upper()
-
-    headers = {
-        "client_id": client_id,
-        "sign": signature,
-        "t": t,
-        "sign_method": "HMAC-SHA256",
-        "nonce": nonce,
-    }
-
-    url = f"{base_url}{url_path}"
-    response = requests.get(url, headers=headers)
-    _LOGGER.debug(f"[{DOMAIN}] 🔄 Refresh response: {response.status_code} | {response.text}")
+    response = client.refresh_token(refresh_token_val)
+    _LOGGER.debug(f"[{DOMAIN}] 🔄 Refresh response: {response.status_code}")
 
     if response.status_code == 200 and response.json().get("success"):
         with open(token_file, "w") as f:
@@ -90,42 +71,20 @@ def _refresh_existing(client_id, client_secret, base_url, refresh_token_val, tok
         _LOGGER.info(f"[{DOMAIN}] ✅ Token refreshed and saved.")
         return True
 
-    _LOGGER.warning(f"[{DOMAIN}] ❌ Failed to refresh: {response.status_code} | {response.text}")
+    _LOGGER.warning(f"[{DOMAIN}] ❌ Failed to refresh: {response.status_code} | {response.json().get('msg')}")
     return False
 
 
-def _request_new(client_id, client_secret, base_url, token_file):
+def _request_new(client, token_file):
     """Request a new token from scratch using grant_type=1."""
-    url_path = "/v1.0/token?grant_type=1"
-    method = "GET"
-
-    t = str(int(time.time() * 1000))
-    nonce = str(uuid.uuid4())
-    content_hash = hashlib.sha256("".encode()).hexdigest()
-    string_to_sign = f"{method}\n{content_hash}\n\n{url_path}"
-    sign_str = f"{client_id}{t}{nonce}{string_to_sign}"
-
-    signature = hmac.new(
-        client_secret.encode(),
-        sign_str.encode(),
-        hashlib.sha256
-    ).hexdigest().upper()
-
-    headers = {
-        "client_id": client_id,
-        "sign": signature,
-        "t": t,
-        "sign_method": "HMAC-SHA256",
-        "nonce": nonce,
-    }
-
-    url = f"{base_url}{url_path}"
-    response = requests.get(url, headers=headers)
-    _LOGGER.debug(f"[{DOMAIN}] 🆕 New token response: {response.status_code} | {response.text}")
+    response = client.new_token()
+    _LOGGER.debug(f"[{DOMAIN}] 🆕 New token response: {response.status_code}")
 
     if response.status_code == 200 and response.json().get("success"):
         with open(token_file, "w") as f:
             json.dump(response.json()["result"], f, indent=2)
         _LOGGER.info(f"[{DOMAIN}] ✅ New token fetched and saved.")
-    else:
-        _LOGGER.error(f"[{DOMAIN}] ❌ Failed to request new token: {response.status_code} | {response.text}")
+        return True
+
+    _LOGGER.error(f"[{DOMAIN}] ❌ Failed to request new token: {response.status_code} | {response.json().get('msg')}")
+    return False
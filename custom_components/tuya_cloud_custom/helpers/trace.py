@@ -0,0 +1,62 @@
+"""
+Tuya Cloud Custom: Request trace
+--------------------------------
+Fixed-size in-memory ring buffer of the last TRACE_SIZE cloud calls
+(status, command, token), shared by all projects.
+
+Each call costs one tuple append: endpoint template, device, attempt, HTTP
+status, Tuya error code, response size and timing phases. Headers, tokens and
+bodies are never kept (errors are stored as the exception type only), so it
+can stay on in production. Dump it with the `dump_trace` service.
+"""
+
+import json
+import time
+from collections import deque
+
+from ..const import TRACE_SIZE
+
+FIELDS = ("ts", "kind", "device", "endpoint", "attempt", "http", "code", "bytes",
+          "sign_ms", "http_ms", "total_ms", "error")
+
+
+class RequestTrace:
+    """Thread-safe enough for executor use: deque.append with maxlen is atomic."""
+
+    def __init__(self, size: int):
+        self._buffer = deque(maxlen=size)
+
+    def add(self, kind: str, device, endpoint: str, attempt: int, started: float, signed: float,
+            response=None, error: Exception | None = None):
+        """Record one call. started/signed are time.monotonic() before signing / before sending."""
+        now = time.monotonic()
+        http = code = size = None
+        if response is not None:
+            http = response.status_code
+            content = response.content or b""
+            size = len(content)
+            if b'"success":false' in content or b'"success": false' in content:  # decode failures only
+                try:
+                    code = json.loads(content).get("code")
+                except ValueError:
+                    pass
+
+        self._buffer.append((
+            round(time.time(), 3), kind, device, endpoint, attempt, http, code, size,
+            round((signed - started) * 1000, 1), round((now - signed) * 1000, 1),
+            round((now - started) * 1000, 1), type(error).__name__ if error else None,
+        ))
+
+    def entries(self) -> list:
+        return [dict(zip(FIELDS, entry)) for entry in list(self._buffer)]
+
+    def dump(self, path: str) -> int:
+        """Write the buffer as JSON lines (executor only). Returns the record count."""
+        entries = self.entries()
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        return len(entries)
+
+
+TRACE = RequestTrace(TRACE_SIZE)
@@ -1,65 +1,74 @@
 """Tuya Cloud Custom: Generic Tuya API Command Helper."""
 
 import json
-import uuid
 import time
-import hmac
-import hashlib
 import logging
-import requests
 
 from ..const import DOMAIN
+from .cloud_worker import CommandNotSent, WorkerResponse
+from .command_queue import QueuedResponse, UnsentResponse
+from .helper import get_entry_data
+from .spec_cache import validate_command
 
 _LOGGER = logging.getLogger(__name__)
 
 
 def send_tuya_command(hass, tuya_id: str, dp_code: str, value):
     """Generic helper to send a Tuya Cloud command."""
+    return send_tuya_commands(hass, tuya_id, [{"code": dp_code, "value": value}])
+
+
+def send_tuya_commands(hass, tuya_id: str, commands: list, queue_on_failure: bool = True):
+    """Send several DP commands to one device in a single POST.
+
+    Transport failures (cloud unreachable) are handed to the offline command
+    queue and a QueuedResponse is returned. With queue_on_failure=False they
+    return an UnsentResponse instead. None means rejected locally, failed
+    otherwise, or an unknown outcome.
+    """
+    import requests  # deferred: only needed in the executor
+
     try:
-        secrets = hass.data[DOMAIN]["secrets"]
-        token_file = hass.data[DOMAIN]["token_file"]
-
-        with open(token_file) as f:
-            token_data = json.load(f)
-        access_token = token_data["access_token"]
-
-        client_id = secrets["client_id"]
-        client_secret = secrets["client_secret"]
-        base_url = secrets["base_url"]
-
-        url_path = f"/v1.0/devices/{tuya_id}/commands"
-        url = f"{base_url}{url_path}"
-
-        payload = {
-            "commands": [{"code": dp_code, "value": value}]
-        }
-
-        t = str(int(time.time() * 1000))
-        nonce = str(uuid.uuid4())
-        content_str = json.dumps(payload)
-        content_hash = hashlib.sha256(content_str.encode("utf-8")).hexdigest()
-        string_to_sign = f"POST\n{content_hash}\n\n{url_path}"
-        sign_str = client_id + access_token + t + nonce + string_to_sign
-        signature = hmac.new(
-            client_secret.encode("utf-8"),
-            sign_str.encode("utf-8"),
-            hashlib.sha256
-        ).hexdigest().upper()
-
-        headers = {
-            "client_id": client_id,
-            "access_token": access_token,
-            "sign": signature,
-            "t": t,
-            "sign_method": "HMAC-SHA256",
-            "nonce": nonce,
-            "Content-Type": "application/json",
-        }
-
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        _LOGGER.debug("[%s] ✅ Command %s=%s → %s", DOMAIN, dp_code, value, response.text)
+        data = get_entry_data(hass, tuya_id)
+
+        # 📘 Reject out-of-range / read-only values before any network call
+        spec = data.get("dp_specs", {}).get(tuya_id)
+        if spec:
+            for cmd in commands:
+                error = validate_command(spec, cmd["code"], cmd["value"])
+                if error:
+                    _LOGGER.error("[%s] ❌ Command %s.%s=%s rejected locally: %s",
+                                  DOMAIN, tuya_id, cmd["code"], cmd["value"], error)
+                    return None
+
+        # 🏠 LAN first when configured; any failure falls through to the cloud
+        local = data.get("local", {}).get(tuya_id)
+        if local and local.send_commands(commands):
+            return WorkerResponse(200, json.dumps({"success": True, "result": True, "t": int(time.time() * 1000)}))
+
+        # 🧵 Worker mode: signing and HTTP happen in the worker process
+        worker = data.get("worker")
+        if worker and worker.alive:
+            return worker.send_commands(tuya_id, commands)
+
+        response = data["client"].send_commands(tuya_id, commands)
+        _LOGGER.debug("[%s] ✅ Commands %s → %s", DOMAIN, commands, response.text)
+
+        recorder = data.get("recorder")
+        if recorder:
+            recorder.record("command", tuya_id, response, request=commands)
         return response
 
+    except (requests.exceptions.RequestException, CommandNotSent) as e:
+        _LOGGER.warning("[%s] ⚠️ Tuya cloud unreachable for %s: %s", DOMAIN, tuya_id, e)
+        if not queue_on_failure:
+            return UnsentResponse(str(e))
+        queue = data.get("command_queue")
+        if queue:
+            queue.enqueue(tuya_id, commands)
+            return QueuedResponse()
+        return None
+
     except Exception as e:
         _LOGGER.exception("[%s] ❌ Failed to send Tuya command: %s", DOMAIN, e)
         return None
@@ -5,20 +5,18 @@ from homeassistant.components.number import NumberEntity
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import DOMAIN
-from .helpers.helper import build_entity_attrs, build_device_info
+from .helpers.helper import build_entity_attrs, build_device_info, get_entry_data, skip_if_unchanged_age, is_redundant_command
 from .helpers.tuya_command import send_tuya_command
+from .helpers.optimistic import async_send_optimistic
+from .helpers.debounce import CommandDebouncer
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Tuya Cloud Custom numbers."""
-    devices = hass.data[DOMAIN]["devices"]
-    numbers = []
-    for device in devices:
-        for dp in device.get("entities", []):
-            if dp.get("platform") == "number" and dp.get("enabled", True):
-                numbers.append(TuyaCloudNumber(hass, device, dp))
+    index = hass.data[DOMAIN][config_entry.entry_id]["platform_index"]
+    numbers = [TuyaCloudNumber(hass, device, dp) for device, dp in index.get("number", [])]
     async_add_entities(numbers)
     _LOGGER.info("[%s] ✅ Registered %s numbers", DOMAIN, len(numbers))
 
@@ -29,6 +27,7 @@ class TuyaCloudNumber(NumberEntity, RestoreEntity):
     def __init__(self, hass, device, dp):
         self._hass = hass
         self._device = device
+        self._data = get_entry_data(hass, device["tuya_device_id"])
         self._dp = dp
         self._state = None
         self._last_sent_value = None
@@ -50,9 +49,18 @@ class TuyaCloudNumber(NumberEntity, RestoreEntity):
         self._dp_type = dp.get("type", "float")
         self._is_passive = dp.get("is_passive_entity", False)
         self._restore_on_reconnect = dp.get("restore_on_reconnect", False)
+        self._optimistic = dp.get("optimistic", False)
+        self._skip_age = skip_if_unchanged_age(dp)
+
+        # ⏳ Optional debounce window (seconds) — only the last value is sent
+        self._debouncer = None
+        if dp.get("debounce"):
+            self._debouncer = CommandDebouncer(
+                hass, float(dp["debounce"]), self._async_send_value, self._attr_unique_id
+            )
 
         key = (device["tuya_device_id"], dp["code"])
-        self._hass.data[DOMAIN]["entities"][key] = self
+        self._data["entities"][key] = self
 
         _LOGGER.debug("[%s] ✅ Registered number entity: %s | Passive=%s | Restore=%s",
                       DOMAIN, key, self._is_passive, self._restore_on_reconnect)
@@ -83,6 +91,22 @@ class TuyaCloudNumber(NumberEntity, RestoreEntity):
         else:
             value_to_send = value
 
+        if self._debouncer:
+            self._debouncer.async_schedule(value_to_send)
+            return
+
+        await self._async_send_value(value_to_send)
+
+    async def _async_send_value(self, value_to_send):
+        """Send the already type-cast value to Tuya."""
+        if is_redundant_command(self._hass, self._device["tuya_device_id"], self._dp["code"], value_to_send, self._skip_age):
+            return
+
+        if self._optimistic:
+            self._last_sent_value = value_to_send
+            await async_send_optimistic(self, value_to_send, value_to_send)
+            return
+
         response = await self._hass.async_add_executor_job(
             send_tuya_command,
             self._hass,
@@ -116,23 +140,24 @@ class TuyaCloudNumber(NumberEntity, RestoreEntity):
                     _LOGGER.info("[%s] ♻️ Restoring number '%s' to %s (restore_on_reconnect)",
                                  DOMAIN, self._attr_unique_id, restored)
 
-                    await self._hass.async_add_executor_job(
-                        send_tuya_command,
-                        self._hass,
-                        self._device["tuya_device_id"],
-                        self._dp["code"],
-                        restored
-                    )
+                    def _on_restored():
+                        self._state = restored
+                        self._last_sent_value = restored
+                        self.async_write_ha_state()
 
-                    self._state = restored
-                    self._last_sent_value = restored
+                    # Sent by the coordinator: merged per device, skipped if already matching
+                    self._data["restore"].async_request(self, restored, _on_restored)
                     self._restored_once = True
-                    self.async_write_ha_state()
 
                 except Exception as e:
                     _LOGGER.warning("[%s] ❌ Failed to restore number '%s': %s",
                                     DOMAIN, self._attr_unique_id, e)
 
+    async def async_will_remove_from_hass(self):
+        """Drop pending debounced values."""
+        if self._debouncer:
+            self._debouncer.async_cancel()
+
     async def async_update(self):
         """No polling — status pushes updates."""
         pass
@@ -5,20 +5,17 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import DOMAIN
-from .helpers.helper import build_entity_attrs, build_device_info
+from .helpers.helper import build_entity_attrs, build_device_info, get_entry_data, skip_if_unchanged_age, is_redundant_command
 from .helpers.tuya_command import send_tuya_command
+from .helpers.optimistic import async_send_optimistic
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Tuya Cloud Custom selects."""
-    devices = hass.data[DOMAIN]["devices"]
-    selects = []
-    for device in devices:
-        for dp in device.get("entities", []):
-            if dp.get("platform") == "select" and dp.get("enabled", True):
-                selects.append(TuyaCloudSelect(hass, device, dp))
+    index = hass.data[DOMAIN][config_entry.entry_id]["platform_index"]
+    selects = [TuyaCloudSelect(hass, device, dp) for device, dp in index.get("select", [])]
     async_add_entities(selects)
     _LOGGER.info("[%s] ✅ Registered %s selects", DOMAIN, len(selects))
 
@@ -29,6 +26,7 @@ class TuyaCloudSelect(SelectEntity, RestoreEntity):
     def __init__(self, hass, device, dp):
         self._hass = hass
         self._device = device
+        self._data = get_entry_data(hass, device["tuya_device_id"])
         self._dp = dp
         self._state = None
 
@@ -43,6 +41,8 @@ class TuyaCloudSelect(SelectEntity, RestoreEntity):
         self._options_map = dp.get("options", {})
         self._is_passive = dp.get("is_passive_entity", False)
         self._restore_on_reconnect = dp.get("restore_on_reconnect", False)
+        self._optimistic = dp.get("optimistic", False)
+        self._skip_age = skip_if_unchanged_age(dp)
         self._last_sent_option = None
         self._restored_once = False
 
@@ -59,7 +59,7 @@ class TuyaCloudSelect(SelectEntity, RestoreEntity):
         self._attr_options = list(self._options_map.values())
 
         key = (device["tuya_device_id"], dp["code"])
-        self._hass.data[DOMAIN]["entities"][key] = self
+        self._data["entities"][key] = self
 
         _LOGGER.debug(
             "[%s] ✅ Registered select entity: %s | Options: %s | Passive=%s | Restore=%s",
@@ -84,10 +84,18 @@ class TuyaCloudSelect(SelectEntity, RestoreEntity):
                 and not self._restored_once
             ):
                 restored = last_state.state
-                self._last_sent_option = restored
                 _LOGGER.info("[%s] ♻️ Restoring select '%s' to %s",
                              DOMAIN, self._attr_unique_id, restored)
-                await self._send_select_command(restored)
+
+                def _on_restored():
+                    self._state = restored
+                    self._last_sent_option = restored
+                    self.async_write_ha_state()
+
+                # Sent by the coordinator: merged per device, skipped if already matching
+                self._data["restore"].async_request(
+                    self, self._label_to_key[restored], _on_restored
+                )
                 self._restored_once = True
 
     async def async_update(self):
@@ -139,6 +147,14 @@ class TuyaCloudSelect(SelectEntity, RestoreEntity):
         """Send the select command using standard helper."""
         key_to_send = self._label_to_key[option]
 
+        if is_redundant_command(self._hass, self._device["tuya_device_id"], self._dp["code"], key_to_send, self._skip_age):
+            return
+
+        if self._optimistic:
+            self._last_sent_option = option
+            await async_send_optimistic(self, key_to_send, option)
+            return
+
         try:
             response = await self._hass.async_add_executor_job(
                 send_tuya_command,
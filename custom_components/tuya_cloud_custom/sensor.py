@@ -1,43 +1,41 @@
 """Tuya Cloud Custom - Robust Sensor platform with translate + mirror support."""
 
 import logging
+import time
+
 from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.event import async_track_state_change_event
-from homeassistant.const import STATE_UNKNOWN
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
 
 from .const import DOMAIN
-from .helpers.helper import build_entity_attrs, build_device_info
+from .helpers.helper import build_entity_attrs, build_device_info, get_entry_data, sanitize
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Initialize Tuya Cloud Custom sensors."""
-    devices = hass.data[DOMAIN]["devices"]
+    index = hass.data[DOMAIN][config_entry.entry_id]["platform_index"]
     sensors = []
 
-    for device in devices:
-        for dp in device.get("entities", []):
-            if not dp.get("enabled", True):
-                continue
-
-            # Handle mirrored climate sensor
-            if dp.get("mirrored", False):
-                if "from_climate" in dp and "from_entity" in dp:
-                    try:
-                        sensors.append(MirroredClimateSensor(hass, device, dp))
-                        _LOGGER.info("[%s] ➕ Registered mirrored climate sensor: %s", DOMAIN, dp)
-                    except Exception as e:
-                        _LOGGER.warning("[%s] ❌ Failed to create mirrored sensor: %s", DOMAIN, e)
-                else:
-                    _LOGGER.warning("[%s] ❌ Skipped mirrored sensor due to missing config: %s", DOMAIN, dp)
-
-            # Handle regular Tuya sensor
-            elif dp.get("platform") == "sensor":
+    for device, dp in index.get("sensor", []):
+        # Handle mirrored climate sensor
+        if dp.get("mirrored", False):
+            if "from_climate" in dp and "from_entity" in dp:
                 try:
-                    sensors.append(TuyaCloudSensor(hass, device, dp))
+                    sensors.append(MirroredClimateSensor(hass, device, dp))
+                    _LOGGER.info("[%s] ➕ Registered mirrored climate sensor: %s", DOMAIN, dp)
                 except Exception as e:
-                    _LOGGER.warning("[%s] ❌ Failed to create sensor: %s", DOMAIN, e)
+                    _LOGGER.warning("[%s] ❌ Failed to create mirrored sensor: %s", DOMAIN, e)
+            else:
+                _LOGGER.warning("[%s] ❌ Skipped mirrored sensor due to missing config: %s", DOMAIN, dp)
+
+        # Handle regular Tuya sensor
+        else:
+            try:
+                sensors.append(TuyaCloudSensor(hass, device, dp))
+            except Exception as e:
+                _LOGGER.warning("[%s] ❌ Failed to create sensor: %s", DOMAIN, e)
 
     async_add_entities(sensors)
     _LOGGER.info("[%s] ✅ Registered %s sensors", DOMAIN, len(sensors))
@@ -49,6 +47,7 @@ class TuyaCloudSensor(SensorEntity):
     def __init__(self, hass, device, dp):
         self._hass = hass
         self._device = device
+        self._data = get_entry_data(hass, device["tuya_device_id"])
         self._dp = dp
         self._state = None
 
@@ -65,8 +64,19 @@ class TuyaCloudSensor(SensorEntity):
         self._dp_type = dp.get("type", "string")
         self._translated = dp.get("translated", {})
 
+        # 📉 Optional write filtering: deadband (absolute or "N%"), min_write_interval, heartbeat
+        deadband = dp.get("deadband")
+        self._deadband = float(str(deadband).rstrip("% ")) if deadband is not None else None
+        self._deadband_pct = isinstance(deadband, str) and deadband.strip().endswith("%")
+        self._min_write_interval = float(dp.get("min_write_interval", 0))
+        self._heartbeat = float(dp.get("heartbeat", 0))
+        self._filtered = deadband is not None or self._min_write_interval > 0 or self._heartbeat > 0
+        self._written = None  # (state, attributes) last written to HA
+        self._written_at = 0.0
+        self._pending_write = None
+
         key = (device["tuya_device_id"], dp["code"])
-        self._hass.data[DOMAIN]["entities"][key] = self
+        self._data["entities"][key] = self
 
         _LOGGER.debug("[%s] ✅ Registered Tuya sensor entity: %s", DOMAIN, key)
 
@@ -92,8 +102,53 @@ class TuyaCloudSensor(SensorEntity):
             _LOGGER.exception("[%s] ❌ Failed to parse sensor value: %s", DOMAIN, e)
             self._state = value
 
+        if self._filtered:
+            self._async_write_filtered()
+        else:
+            self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self):
+        if self._pending_write:
+            self._pending_write()
+            self._pending_write = None
+
+    @callback
+    def _async_write_filtered(self):
+        """Write only meaningful changes; the latest value is always written eventually."""
+        now = time.monotonic()
+        attrs = getattr(self, "_attr_extra_state_attributes", None)
+        if self._written is not None and self._written[1] == attrs:
+            heartbeat_due = self._heartbeat and now - self._written_at >= self._heartbeat
+            if not heartbeat_due and self._within_deadband(self._written[0], self._state):
+                return
+            wait = self._min_write_interval - (now - self._written_at)
+            if wait > 0:
+                if self._pending_write is None:
+                    self._pending_write = async_call_later(self._hass, wait, self._async_flush)
+                return
+        self._async_write_now()
+
+    @callback
+    def _async_flush(self, _now):
+        self._pending_write = None
+        self._async_write_now()
+
+    @callback
+    def _async_write_now(self):
+        if self._pending_write:
+            self._pending_write()
+            self._pending_write = None
+        self._written = (self._state, getattr(self, "_attr_extra_state_attributes", None))
+        self._written_at = time.monotonic()
         self.async_write_ha_state()
 
+    def _within_deadband(self, old, new) -> bool:
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (old, new))
+        if self._deadband is None or not numeric:
+            return old == new
+        band = abs(old) * self._deadband / 100 if self._deadband_pct else self._deadband
+        return abs(new - old) < band
+
     def _parse_value(self, value):
         if self._dp_type == "boolean":
             return bool(value)
@@ -115,17 +170,20 @@ class TuyaCloudSensor(SensorEntity):
 
 
 class MirroredClimateSensor(SensorEntity):
-    """A read-only sensor that mirrors a climate attribute like current_temperature."""
+    """A read-only sensor that mirrors a climate attribute like current_temperature.
+
+    Bound to the source TuyaCloudClimate through data["mirrors"]; the climate
+    pushes to it in the same dispatch pass, no state machine round trip.
+    """
 
     def __init__(self, hass, device, dp):
         self._hass = hass
         self._device = device
+        self._data = get_entry_data(hass, device["tuya_device_id"])
         self._dp = dp
         self._state = None
 
-        device_slug = device["friendly_name"].lower().replace(" ", "_")
-        climate_slug = dp["from_climate"]
-        self._source_entity_id = f"climate.{device_slug}_{climate_slug}"
+        self._source_key = (device["tuya_device_id"], sanitize(dp["from_climate"]))
         self._from_attr = dp["from_entity"]
 
         self._attr_name = f"{dp['from_climate'].replace('_', ' ').title()} {dp['from_entity'].replace('_', ' ').title()}"
@@ -144,26 +202,38 @@ class MirroredClimateSensor(SensorEntity):
         return build_device_info(self._device)
 
     async def async_added_to_hass(self):
-        """Attach state tracking from the source climate entity."""
-        async def _update(event):
-            new_state = event.data.get("new_state")
-            if not new_state or new_state.state in (None, STATE_UNKNOWN):
-                return
-            try:
-                new_val = new_state.attributes.get(self._from_attr)
-                _LOGGER.debug(
-                    "[%s] 🔁 Mirrored sensor update from %s.%s: %s",
-                    DOMAIN, self._source_entity_id, self._from_attr, new_val
-                )
-                if isinstance(new_val, (int, float)):
-                    self._state = new_val
-                    self.async_write_ha_state()
-                else:
-                    _LOGGER.debug("[%s] 🚫 Ignored non-numeric mirrored value: %s", DOMAIN, new_val)
-            except Exception as e:
-                _LOGGER.warning("[%s] ⚠️ Failed to update mirrored sensor: %s", DOMAIN, e)
-
-        async_track_state_change_event(self._hass, [self._source_entity_id], _update)
+        """Bind to the source climate and take its current value, if it already has one."""
+        self._data.setdefault("mirrors", {}).setdefault(self._source_key, []).append(self)
+        climate = self._data.get("climates", {}).get(self._source_key)
+        if climate is not None:
+            self.async_update_from_climate(climate)
+        else:
+            _LOGGER.debug("[%s] ⏳ Mirror %s waiting for climate %s", DOMAIN, self._attr_unique_id, self._source_key)
+
+    async def async_will_remove_from_hass(self):
+        mirrors = self._data.get("mirrors", {}).get(self._source_key, [])
+        if self in mirrors:
+            mirrors.remove(self)
+
+    @callback
+    def async_update_from_climate(self, climate):
+        """Called by the source climate after it processed a status update."""
+        try:
+            new_val = getattr(climate, self._from_attr)
+        except Exception as e:
+            _LOGGER.warning("[%s] ⚠️ Failed to update mirrored sensor: %s", DOMAIN, e)
+            return
+
+        if not isinstance(new_val, (int, float)) or isinstance(new_val, bool):
+            _LOGGER.debug("[%s] 🚫 Ignored non-numeric mirrored value: %s", DOMAIN, new_val)
+            return
+        if new_val == self._state or self.hass is None:
+            return
+
+        _LOGGER.debug("[%s] 🔁 Mirrored sensor update from %s.%s: %s",
+                      DOMAIN, self._source_key, self._from_attr, new_val)
+        self._state = new_val
+        self.async_write_ha_state()
 
 
     async def async_update(self):
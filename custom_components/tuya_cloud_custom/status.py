@@ -3,38 +3,73 @@
 import asyncio
 import logging
 import json
+import os
 import time
-import uuid
-import hmac
-import hashlib
 
-from datetime import timedelta
-
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.core import HomeAssistant
-from .climate import TuyaCloudClimate
-from .const import DOMAIN
-
-import requests
+from .const import (
+    DOMAIN, WARMUP_CONCURRENCY, WARMUP_SPACING, SNAPSHOT_INTERVAL, ONLINE_CHECK_BATCH,
+    LOAD_PROBE_INTERVAL, LOAD_MAX_SKIPS,
+)
+from .helpers.cloud_client import STATUS_ENDPOINT
+from .helpers.cloud_worker import WorkerResponse
+from .helpers.helper import dp_values_equal
+from .helpers.load_monitor import LoadMonitor
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _set_stale(entity, stale: bool):
+    """Set or clear only the `stale` attribute, keeping any others."""
+    attrs = getattr(entity, "_attr_extra_state_attributes", None) or {}
+    if stale:
+        entity._attr_extra_state_attributes = {**attrs, "stale": True}
+    elif "stale" in attrs:
+        entity._attr_extra_state_attributes = {k: v for k, v in attrs.items() if k != "stale"} or None
+
+
 class Status:
     """Tuya Cloud Custom: Periodic Status Poller."""
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(self, hass: HomeAssistant, data: dict):
         self.hass = hass
-        self.devices = hass.data[DOMAIN]["devices"]
-        self.secrets = hass.data[DOMAIN]["secrets"]
+        self.data = data  # config entry runtime data
+        self.devices = data["devices"]
+        self.secrets = data["secrets"]
+
+        self.token_file = data["token_file"]
+        self.lifecycle = data["lifecycle"]  # every timer / task below is owned by it
+
+        # Last-known DP values: (tuya_id, code) → (value, monotonic time seen)
+        self.last_values = {}
+        self.warmup_seconds = None
+
+        # 💾 Write-behind snapshot of last-known values
+        self.snapshot_file = data.get("snapshot_file")
+        self._snapshot_dirty = False
+        self._snapshot_base = {}  # loaded values, kept for devices not polled yet
+
+        # 📶 Cloud `online` flags from the batch online check: tuya_id → bool
+        self.online = {}
+
+        # 🐢 Loop lag / executor depth — thins out routine polls while HA is busy
+        self.load = LoadMonitor(hass)
 
-        self.base_url = self.secrets["base_url"]
-        self.client_id = self.secrets["client_id"]
-        self.client_secret = self.secrets["client_secret"]
-        self.token_file = hass.data[DOMAIN]["token_file"]
+        # ✂️ Optional hedged cloud reads (see helpers/hedge.py)
+        self.hedge = None
+        if self.secrets.get("hedge_status_reads"):
+            from .helpers.hedge import HedgeBudget
+            self.hedge = HedgeBudget()
 
     async def async_start_polling(self):
         """Start polling each device at its configured interval."""
+        worker = self.data.get("worker")
+        if worker:
+            await self.hass.async_add_executor_job(worker.start)
+            return
+
+        self.load.start()
+
         for device in self.devices:
             if not device.get("enabled", True):
                 _LOGGER.info("[%s] ⏹️ Device %s is disabled; skipping.", DOMAIN, device.get("tuya_device_id"))
@@ -47,77 +82,338 @@ class Status:
             _LOGGER.info("[%s] ⏱️ Scheduling status every %s sec for %s", DOMAIN, interval, device["tuya_device_id"])
 
             async def _poll_device(now, dev=device):
+                if self.is_paused(dev["tuya_device_id"]) or self.load.should_skip_poll(dev["tuya_device_id"]):
+                    return
                 await self.async_fetch_status(dev)
 
-            async_track_time_interval(
-                self.hass,
-                _poll_device,
-                timedelta(seconds=interval)
-            )
+            self.lifecycle.track_interval("poll", _poll_device, interval)
+
+        _LOGGER.info("[%s] ⏱️ %s pollers active", DOMAIN, self.lifecycle.count("poll"))
+
+    async def async_warm_up(self):
+        """Fetch every enabled device once right away, batched and rate-limited."""
+        if self.data.get("worker"):
+            return  # the worker polls every device as soon as it starts
+
+        devices = [d for d in self.devices if d.get("enabled", True)]
+        semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+        started = time.monotonic()
+
+        async def _fetch(index, device):
+            if self.is_paused(device["tuya_device_id"]):
+                return None
+            await asyncio.sleep(index * WARMUP_SPACING)
+            for _ in range(LOAD_MAX_SKIPS):  # defer a little while HA is busy, but always fetch
+                if not self.load.overloaded():
+                    break
+                await asyncio.sleep(LOAD_PROBE_INTERVAL)
+            async with semaphore:
+                try:
+                    return await self.async_fetch_status(device)
+                except Exception as e:
+                    # One bad device must not stop the warm-up (or what _start_status runs after it)
+                    _LOGGER.warning("[%s] ⚠️ Warm-up of %s failed: %s", DOMAIN, device["tuya_device_id"], e)
+                    return None
+
+        results = await asyncio.gather(*(_fetch(i, d) for i, d in enumerate(devices)))
+        self.warmup_seconds = round(time.monotonic() - started, 2)
+
+        entities = self.data["entities"]
+        with_state = sum(1 for key in entities if key in self.last_values)
+        _LOGGER.info("[%s] 🔥 Warm-up: %s/%s devices answered, %s/%s entity DPs have state after %ss",
+                     DOMAIN, sum(1 for r in results if r is not None), len(devices),
+                     with_state, len(entities), self.warmup_seconds)
+
+    async def async_fall_back_from_worker(self):
+        """The worker process died (its bridge is already gone): poll in-process from now on."""
+        await self.async_start_polling()
+        await self.async_warm_up()
+
+    # --------------------------------------------------------------------------
+    # 📶 Online check
+    # --------------------------------------------------------------------------
+    async def async_start_online_check(self, interval: int):
+        """Check `online` flags now and every interval seconds (not in worker mode)."""
+        if self.data.get("worker") or interval <= 0:
+            return
+        await self.async_check_online()
+        self.lifecycle.track_interval("online_check", self.async_check_online, interval)
+
+    async def async_check_online(self, _now=None):
+        """Pause offline devices (entities unavailable) and fetch returning ones right away."""
+        if _now is not None and self.load.overloaded():
+            return  # routine check; the next interval will do
+        ids = [d["tuya_device_id"] for d in self.devices if d.get("enabled", True)]
+        flags = await self.hass.async_add_executor_job(self._fetch_online, ids)
+
+        for device in self.devices:
+            tuya_id = device["tuya_device_id"]
+            if tuya_id not in flags:
+                continue
+            was_online = self.online.get(tuya_id, True)
+            self.online[tuya_id] = flags[tuya_id]
+            if flags[tuya_id] == was_online:
+                continue
+
+            if flags[tuya_id]:
+                _LOGGER.info("[%s] 📶 %s is back online — fetching status", DOMAIN, tuya_id)
+                self._set_available(tuya_id, True)
+                self.lifecycle.create_task(self.async_fetch_status(device))
+            else:
+                _LOGGER.info("[%s] 📴 %s is offline — polling paused", DOMAIN, tuya_id)
+                self._set_available(tuya_id, False)
+
+    def is_paused(self, tuya_id: str) -> bool:
+        """Offline in the cloud and not reachable over the LAN path."""
+        return self.online.get(tuya_id) is False and tuya_id not in self.data.get("local", {})
+
+    def _set_available(self, tuya_id: str, available: bool):
+        entities = {id(e): e for (tid, _), e in self.data["entities"].items() if tid == tuya_id}
+        for (tid, _), mirrors in self.data.get("mirrors", {}).items():
+            if tid == tuya_id:
+                entities.update((id(m), m) for m in mirrors)
+        for entity in entities.values():
+            entity._attr_available = available
+            if entity.hass is not None:
+                entity.async_write_ha_state()
+
+    def _fetch_online(self, ids: list) -> dict:
+        """Batch `online` lookup via /v1.0/devices?device_ids=… (executor only)."""
+        import requests  # deferred: only needed in the executor
+
+        flags = {}
+        for start in range(0, len(ids), ONLINE_CHECK_BATCH):
+            url_path = f"/v1.0/devices?device_ids={','.join(ids[start:start + ONLINE_CHECK_BATCH])}"
+            try:
+                result = self.data["client"].get_result(url_path, kind="online") or []
+            except (requests.exceptions.RequestException, ValueError) as e:
+                _LOGGER.warning("[%s] ⚠️ Online check failed: %s", DOMAIN, e)
+                continue
+
+            if isinstance(result, dict):
+                result = result.get("devices") or result.get("list") or []
+            for item in result:
+                if "online" in item:
+                    flags[item["id"]] = bool(item["online"])
+        return flags
 
     async def async_fetch_status(self, device: dict):
-        """Fetch status from Tuya API for a single device."""
-        response = await self.hass.async_add_executor_job(self._do_request, device)
-
-        if response and response.status_code == 200 and response.json().get("success"):
-            payload = response.json()["result"]
-            for dp in payload:
-                dp_code = dp["code"]
-                value = dp["value"]
-                key = (device["tuya_device_id"], dp_code)
-                entity = self.hass.data[DOMAIN]["entities"].get(key)
-
-                if entity:
-                    if isinstance(entity, TuyaCloudClimate):
-                        await entity.async_update_from_status({"code": dp_code, "value": value})
-                    else:
-                        await entity.async_update_from_status(value)
-                else:
-                    _LOGGER.debug("[%s] ⚠️ No entity registered for %s (DP: %s)", DOMAIN, key, dp_code)
+        """Fetch status from Tuya API for a single device.
+
+        Returns the raw DP list on success, or None.
+
+        In worker mode the worker process does the read (no cloud I/O in HA).
+        """
+        worker = self.data.get("worker")
+        if worker and worker.alive:
+            payload = await self.hass.async_add_executor_job(worker.poll, device["tuya_device_id"])
+            if payload is None:
+                _LOGGER.error("[%s] ❌ Cloud worker could not read %s", DOMAIN, device["tuya_device_id"])
+                return None
         else:
-            _LOGGER.error("[%s] ❌ API error for %s: %s",
-                          DOMAIN,
-                          device["tuya_device_id"],
-                          response.text if response else "No response")
+            response = await self._async_request(device)
+            payload = self.decode_status(response)
+            if payload is None:
+                _LOGGER.error("[%s] ❌ API error for %s: %s",
+                              DOMAIN,
+                              device["tuya_device_id"],
+                              response.text if response else "No response")
+                return None
+
+        await self.async_dispatch_status(device["tuya_device_id"], payload)
+
+        # 📤 Device is reachable again — flush anything queued while offline
+        queue = self.data.get("command_queue")
+        if queue and queue.has_pending(device["tuya_device_id"]):
+            await queue.async_replay(device["tuya_device_id"])
+        return payload
+
+    @staticmethod
+    def decode_status(response) -> list | None:
+        """DP list of a successful status response, or None."""
+        if response is None or response.status_code != 200:
+            return None
+        try:
+            body = response.json()
+        except ValueError:
+            return None
+        if not isinstance(body, dict) or not body.get("success"):
+            return None
+        return body.get("result") or []
+
+    async def async_dispatch_status(self, tuya_id: str, payload: list, stale: bool = False,
+                                    commanded: bool = False, replay: bool = False):
+        """Push a list of {code, value} DPs to the registered entities.
+
+        stale=True is used for snapshot values: entities get a `stale` attribute
+        and the values are not trusted as current until a real poll confirms them.
+        commanded=True is used for values we only sent (bulk, queue replay): the
+        entities show them, but last_values / the snapshot keep what the cloud reported.
+        replay=True (recorded responses) is handled the same way as commanded=True.
+        """
+        now = time.monotonic()
+        for dp in payload:
+            dp_code = dp["code"]
+            value = dp["value"]
+            key = (tuya_id, dp_code)
+            if not stale and not commanded and not replay:
+                self.last_values[key] = (value, now)
+                self._snapshot_dirty = True
+            entity = self.data["entities"].get(key)
+
+            if entity is None:
+                _LOGGER.debug("[%s] ⚠️ No entity registered for %s (DP: %s)", DOMAIN, key, dp_code)
+                continue
+            if entity.hass is None:
+                continue  # disabled in the entity registry: built, never added
+
+            try:
+                if not commanded and not replay:
+                    _set_stale(entity, stale)
+
+                if getattr(entity, "_multi_dp", False):
+                    await entity.async_update_from_status({"code": dp_code, "value": value})
+                else:
+                    await entity.async_update_from_status(value)
+            except Exception as e:
+                # One bad value must not stop the other DPs (or setup, for snapshot values)
+                _LOGGER.warning("[%s] ⚠️ Failed to apply %s=%r to %s: %s",
+                                DOMAIN, key, value, entity._attr_unique_id, e)
+
+    # --------------------------------------------------------------------------
+    # 💾 Snapshot
+    # --------------------------------------------------------------------------
+    async def async_load_snapshot(self):
+        """Populate entities from the last snapshot before any network call."""
+        if not self.snapshot_file:
+            return
+        snapshot = await self.hass.async_add_executor_job(self._read_snapshot)
+        devices = snapshot.get("devices", {})
+        self._snapshot_base = devices
+        for tuya_id, values in devices.items():
+            await self.async_dispatch_status(
+                tuya_id, [{"code": c, "value": v} for c, v in values.items()], stale=True
+            )
+        if devices:
+            _LOGGER.info("[%s] 💾 Restored %s devices from snapshot (stale until first poll)",
+                         DOMAIN, len(devices))
+
+        self.lifecycle.track_interval("snapshot", self._async_write_snapshot, SNAPSHOT_INTERVAL)
+
+    async def _async_write_snapshot(self, _now=None):
+        """Write the snapshot if anything changed since the last write."""
+        if not self._snapshot_dirty or not self.snapshot_file:
+            return
+        self._snapshot_dirty = False
+
+        devices = {tid: dict(values) for tid, values in self._snapshot_base.items()}
+        for (tuya_id, code), (value, _) in self.last_values.items():
+            devices.setdefault(tuya_id, {})[code] = value
+        await self.hass.async_add_executor_job(self._write_snapshot, devices)
+
+    def _read_snapshot(self) -> dict:
+        if not os.path.isfile(self.snapshot_file):
+            return {}
+        try:
+            with open(self.snapshot_file, "r") as f:
+                return json.load(f) or {}
+        except Exception as e:
+            _LOGGER.warning("[%s] ⚠️ Ignoring unreadable snapshot %s: %s", DOMAIN, self.snapshot_file, e)
+            return {}
+
+    def _write_snapshot(self, devices: dict):
+        try:
+            tmp = self.snapshot_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"saved": int(time.time()), "devices": devices}, f, separators=(",", ":"))
+            os.replace(tmp, self.snapshot_file)
+        except Exception as e:
+            _LOGGER.warning("[%s] ⚠️ Failed to write snapshot: %s", DOMAIN, e)
+
+    async def async_stop(self):
+        """Stop the load probe and worker, and flush pending values (timers are the Lifecycle's)."""
+        self.load.stop()
+        await self._async_write_snapshot()
+
+        worker = self.data.get("worker")
+        if worker:
+            await self.hass.async_add_executor_job(worker.stop)
+
+    def value_is_current(self, tuya_id: str, dp_code: str, value, max_age: float) -> bool:
+        """True if the DP was last seen holding `value` within max_age seconds."""
+        known = self.last_values.get((tuya_id, dp_code))
+        if known is None or time.monotonic() - known[1] > max_age:
+            return False
+        return dp_values_equal(known[0], value)
+
+    async def _async_request(self, device: dict):
+        """_do_request, plus one duplicate cloud read if it runs past the status p95."""
+        job = self.hass.async_add_executor_job(self._do_request, device)
+        if self.hedge is None or device["tuya_device_id"] in self.data.get("local", {}):
+            return await job
+
+        self.hedge.note_read()
+        delay = self.data["client"].latency_p95(STATUS_ENDPOINT)
+        if delay is None:
+            return await job
+        done, _ = await asyncio.wait({job}, timeout=delay)
+        if done or self.load.overloaded() or not self.hedge.try_spend():
+            return await job
+
+        _LOGGER.debug("[%s] ✂️ Status of %s slower than p95 (%.2fs) — hedging",
+                      DOMAIN, device["tuya_device_id"], delay)
+        duplicate = self.hass.async_add_executor_job(self._do_hedge, device)
+        pending = {job, duplicate}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                response = future.result()
+                if response is not None:  # first usable answer wins; the other is ignored
+                    if future is duplicate:
+                        self.hedge.won += 1
+                    return response
+        return None
+
+    def _do_hedge(self, device: dict):
+        """One duplicate cloud status read (executor only); None on any failure."""
+        import requests  # deferred: only needed in the executor
+
+        try:
+            response = self.data["client"].get_status(device["tuya_device_id"], kind="hedge")
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            _LOGGER.debug("[%s] ✂️ Hedged read for %s failed: %s", DOMAIN, device["tuya_device_id"], e)
+            return None
+
+        recorder = self.data.get("recorder")
+        if recorder:
+            recorder.record("status", device["tuya_device_id"], response)
+        return response
 
     def _do_request(self, device: dict):
         """Internal helper to request device status with retries and backoff."""
+        import requests  # deferred: only needed in the executor
+
+        # 🏠 LAN first when configured; any failure falls through to the cloud
+        local = self.data.get("local", {}).get(device["tuya_device_id"])
+        if local:
+            payload = local.status()
+            if payload is not None:
+                return WorkerResponse(200, json.dumps({"success": True, "result": payload}))
+
         retries = 3
         backoff = 1  # seconds
 
+        client = self.data["client"]
         for attempt in range(1, retries + 1):
             try:
-                with open(self.token_file, "r") as f:
-                    token_data = json.load(f)
-
-                access_token = token_data["access_token"]
                 device_id = device["tuya_device_id"]
-                method = "GET"
-                url_path = f"/v1.0/devices/{device_id}/status"
-                t = str(int(time.time() * 1000))
-                nonce = str(uuid.uuid4())
-                content_hash = hashlib.sha256("".encode()).hexdigest()
-                string_to_sign = f"{method}\n{content_hash}\n\n{url_path}"
-                sign_str = self.client_id + access_token + t + nonce + string_to_sign
-
-                signature = hmac.new(
-                    self.client_secret.encode(),
-                    sign_str.encode(),
-                    hashlib.sha256
-                ).hexdigest().upper()
-
-                headers = {
-                    "client_id": self.client_id,
-                    "access_token": access_token,
-                    "sign": signature,
-                    "t": t,
-                    "sign_method": "HMAC-SHA256",
-                    "nonce": nonce
-                }
-
-                url = f"{self.base_url}{url_path}"
-                response = requests.get(url, headers=headers, timeout=10)
+                response = client.get_status(device_id, attempt)
                 response.raise_for_status()
+
+                recorder = self.data.get("recorder")
+                if recorder:
+                    recorder.record("status", device_id, response)
                 return response
 
             except requests.exceptions.RequestException as e:
@@ -133,9 +429,10 @@ class Status:
         return None
 
     async def async_fetch_all_devices(self):
-        """Manually force-refresh all devices immediately."""
+        """Manually force-refresh all devices immediately (offline ones stay paused)."""
         tasks = [
             self.async_fetch_status(device)
-            for device in self.devices if device.get("enabled", True)
+            for device in self.devices
+            if device.get("enabled", True) and not self.is_paused(device["tuya_device_id"])
         ]
         await asyncio.gather(*tasks)
@@ -5,20 +5,17 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import DOMAIN
-from .helpers.helper import build_entity_attrs, build_device_info
+from .helpers.helper import build_entity_attrs, build_device_info, get_entry_data, skip_if_unchanged_age, is_redundant_command
 from .helpers.tuya_command import send_tuya_command
+from .helpers.optimistic import async_send_optimistic
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Tuya Cloud Custom switches."""
-    devices = hass.data[DOMAIN]["devices"]
-    switches = []
-    for device in devices:
-        for dp in device.get("entities", []):
-            if dp.get("platform") == "switch" and dp.get("enabled", True):
-                switches.append(TuyaCloudSwitch(hass, device, dp))
+    index = hass.data[DOMAIN][config_entry.entry_id]["platform_index"]
+    switches = [TuyaCloudSwitch(hass, device, dp) for device, dp in index.get("switch", [])]
     async_add_entities(switches)
     _LOGGER.info("[%s] ✅ Registered %s switches", DOMAIN, len(switches))
 
@@ -29,6 +26,7 @@ class TuyaCloudSwitch(SwitchEntity, RestoreEntity):
     def __init__(self, hass, device, dp):
         self._hass = hass
         self._device = device
+        self._data = get_entry_data(hass, device["tuya_device_id"])
         self._dp = dp
 
         self._state = False
@@ -44,12 +42,14 @@ class TuyaCloudSwitch(SwitchEntity, RestoreEntity):
         self._dp_type = dp.get("type", "boolean")
         self._is_passive = dp.get("is_passive_entity", False)
         self._restore_on_reconnect = dp.get("restore_on_reconnect", False)
+        self._optimistic = dp.get("optimistic", False)
+        self._skip_age = skip_if_unchanged_age(dp)
 
         self._attr_entity_category = attrs.get("entity_category")
         self._attr_icon = attrs.get("icon")
 
         key = (device["tuya_device_id"], dp["code"])
-        self._hass.data[DOMAIN]["entities"][key] = self
+        self._data["entities"][key] = self
         _LOGGER.debug("[%s] ✅ Registered switch entity: %s | Passive: %s | Restore: %s",
                       DOMAIN, key, self._is_passive, self._restore_on_reconnect)
 
@@ -75,16 +75,15 @@ class TuyaCloudSwitch(SwitchEntity, RestoreEntity):
             return
 
         try:
-            if self._dp_type == "boolean":
-                value = bool(state)
-            elif self._dp_type == "integer":
-                value = int(state)
-            elif self._dp_type == "float":
-                value = float(state)
-            elif self._dp_type == "enum":
-                value = str(state).lower()
-            else:
-                value = state
+            value = self._to_dp_value(state)
+
+            if is_redundant_command(self._hass, self._device["tuya_device_id"], self._dp["code"], value, self._skip_age):
+                return
+
+            if self._optimistic:
+                self._last_ha_command = bool(state)
+                await async_send_optimistic(self, value, bool(state))
+                return
 
             response = await self._hass.async_add_executor_job(
                 send_tuya_command,
@@ -102,6 +101,18 @@ class TuyaCloudSwitch(SwitchEntity, RestoreEntity):
         except Exception as e:
             _LOGGER.warning("[%s] ❌ Switch command failed for %s: %s", DOMAIN, self._attr_unique_id, e)
 
+    def _to_dp_value(self, state):
+        """Cast an on/off state to the DP's raw type."""
+        if self._dp_type == "boolean":
+            return bool(state)
+        elif self._dp_type == "integer":
+            return int(state)
+        elif self._dp_type == "float":
+            return float(state)
+        elif self._dp_type == "enum":
+            return str(state).lower()
+        return state
+
     async def async_added_to_hass(self):
         """Handle entity addition and optional state restore."""
         if self._restore_on_reconnect and not self._is_passive and not self._restored_once:
@@ -110,7 +121,16 @@ class TuyaCloudSwitch(SwitchEntity, RestoreEntity):
                 restored_state = last_state.state == "on"
                 _LOGGER.info("[%s] 🔁 Restoring '%s' to %s (restore_on_reconnect)",
                              DOMAIN, self._attr_unique_id, restored_state)
-                await self._send_tuya_command(restored_state)
+
+                def _on_restored():
+                    self._state = restored_state
+                    self._last_ha_command = restored_state
+                    self.async_write_ha_state()
+
+                # Sent by the coordinator: merged per device, skipped if already matching
+                self._data["restore"].async_request(
+                    self, self._to_dp_value(restored_state), _on_restored
+                )
                 self._restored_once = True
 
     async def async_update(self):
@@ -0,0 +1,132 @@
+"""
+Tuya Cloud Custom: Cloud worker process
+---------------------------------------
+Entry point of the out-of-process cloud worker; the Home Assistant side and
+the pipe protocol are in helpers/cloud_worker.py.
+
+The spawned child runs this file by path (runpy.run_path with `conn` and
+`config` as globals), never as custom_components.tuya_cloud_custom.worker_process:
+that would run the package __init__ and import Home Assistant. Like cli.py,
+the helpers are imported under a bare `tuya_cloud_custom` package instead.
+
+Nothing in this file may import Home Assistant.
+"""
+
+import heapq
+import os
+import sys
+import threading
+import time
+import types
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+if "tuya_cloud_custom" not in sys.modules:
+    _package = types.ModuleType("tuya_cloud_custom")
+    _package.__path__ = [_PACKAGE_DIR]
+    sys.modules["tuya_cloud_custom"] = _package
+
+from tuya_cloud_custom.helpers.cloud_client import TuyaCloudClient  # noqa: E402
+
+_MISSING = object()
+
+
+def worker_main(conn, config: dict):
+    """Entry point of the worker process.
+
+    The main thread reads the pipe and sends commands; scheduled and requested
+    polls run on their own thread, so a command never waits behind a poll.
+    """
+    client = TuyaCloudClient(config["client_id"], config["client_secret"], config["base_url"], config["token_file"])
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+    wake = threading.Condition()
+    poll_now = []  # (req_id, tuya_id) HA asked for, guarded by wake
+    last = {}  # tuya_id → {code: value} as last reported to HA, guarded by wake
+
+    def _reply(msg):
+        with send_lock:
+            conn.send(msg)
+
+    def _poll(tuya_id, req_id=None):
+        try:
+            response = client.get_status(tuya_id)
+            body = response.json()
+        except Exception:
+            body = None
+        if body is None or response.status_code != 200 or not body.get("success"):
+            if req_id is not None:
+                _reply(("polled", req_id, tuya_id, None))
+            return
+
+        payload = body["result"]
+        with wake:
+            known = last.setdefault(tuya_id, {})
+            changed = [dp for dp in payload if known.get(dp["code"], _MISSING) != dp["value"]]
+            known.update((dp["code"], dp["value"]) for dp in payload)
+        if req_id is not None:
+            _reply(("polled", req_id, tuya_id, payload))
+        elif changed:
+            _reply(("status", tuya_id, changed))
+
+    def _poll_loop():
+        due = [(time.monotonic(), tuya_id) for tuya_id in config["intervals"]]  # poll all at start
+        heapq.heapify(due)
+        while True:
+            with wake:
+                if not poll_now and not stopped.is_set():
+                    wake.wait(max(0.0, due[0][0] - time.monotonic()) if due else None)
+                if stopped.is_set():
+                    return
+                requested = poll_now[:]
+                poll_now.clear()
+
+            for req_id, tuya_id in requested:
+                _poll(tuya_id, req_id)
+            if due and due[0][0] <= time.monotonic():
+                when, tuya_id = heapq.heappop(due)
+                _poll(tuya_id)
+                heapq.heappush(due, (max(when + config["intervals"][tuya_id], time.monotonic()), tuya_id))
+
+    def _command(req_id, tuya_id, commands):
+        with wake:
+            last.pop(tuya_id, None)  # HA may now show values the device did not take
+        try:
+            response = client.send_commands(tuya_id, commands)
+            _reply(("result", req_id, response.status_code, response.text))
+        except Exception as e:
+            _reply(("result", req_id, None, str(e)))
+
+    poller = threading.Thread(target=_poll_loop, daemon=True, name="poller")
+    poller.start()
+
+    commands = []  # received, not sent yet: (req_id, tuya_id, commands)
+    while True:
+        # Read everything waiting first, so a cancel can still catch its command
+        if conn.poll(0 if commands else None):
+            msg = conn.recv()
+            if msg[0] == "stop":
+                break
+            if msg[0] == "command":
+                commands.append(msg[1:])
+            elif msg[0] == "cancel":
+                if any(c[0] == msg[1] for c in commands):
+                    commands = [c for c in commands if c[0] != msg[1]]
+                    _reply(("cancelled", msg[1]))
+            elif msg[0] == "poll":
+                with wake:
+                    poll_now.append(msg[1:])
+                    wake.notify()
+            continue
+
+        _command(*commands.pop(0))
+
+    with wake:
+        stopped.set()
+        wake.notify()
+    poller.join(client.timeout + 1)
+    client.close()
+    conn.close()
+
+
+if __name__ == "__tuya_cloud_worker__":  # helpers/cloud_worker.py WORKER_RUN_NAME
+    worker_main(conn, config)  # noqa: F821 — passed in as globals by the parent
@@ -0,0 +1,13 @@
+"""Import the integration's helpers without Home Assistant (same trick as cli.py)."""
+
+import os
+import sys
+import types
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "custom_components", "tuya_cloud_custom")
+
+if "tuya_cloud_custom" not in sys.modules:
+    package = types.ModuleType("tuya_cloud_custom")
+    package.__path__ = [PACKAGE_DIR]
+    sys.modules["tuya_cloud_custom"] = package
@@ -0,0 +1,30 @@
+"""Hourly statistics from report-log change events."""
+
+from tuya_cloud_custom.helpers.backfill import HOUR_MS, _aggregate_hourly
+
+MINUTE_MS = 60 * 1000
+
+
+def _log(minute, value):
+    return {"code": "temp", "event_time": minute * MINUTE_MS, "value": value}
+
+
+def test_mean_is_time_weighted():
+    hours, last = _aggregate_hourly([_log(0, "20"), _log(59, "30")], 0, HOUR_MS)
+    (start, mean, low, high), = hours
+    assert start == 0
+    assert round(mean, 2) == 20.17
+    assert (low, high) == (20, 30)
+    assert last == 30
+
+
+def test_value_is_carried_into_quiet_hours():
+    hours, last = _aggregate_hourly([_log(30, 10)], 0, 3 * HOUR_MS, carry=5.0)
+    assert hours == [(0, 7.5, 5.0, 10.0), (HOUR_MS, 10.0, 10.0, 10.0), (2 * HOUR_MS, 10.0, 10.0, 10.0)]
+    assert last == 10
+
+
+def test_hours_before_the_first_known_value_are_left_out():
+    hours, _ = _aggregate_hourly([_log(90, 4), _log(100, "bad")], 0, 2 * HOUR_MS)
+    assert hours == [(HOUR_MS, 4.0, 4.0, 4.0)]
+    assert _aggregate_hourly([], 0, 2 * HOUR_MS) == ([], None)